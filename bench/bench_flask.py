@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Requests per second of the flask app, in process with and without the response cache vs spawning
+tune-tools.py per request
+
+run:
+python3 bench/bench_flask.py -r 200
+"""
+
+import os
+import argparse
+import sys
+import subprocess
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'flask'))
+
+# (route, form data, equivalent tune-tools.py arguments)
+REQUESTS = [
+    ('/create_chord_chart', {'keybox': 'b', 'usr_txt': 'A\nA C'},
+     ['-w', '-m', 'create_chord_chart', '-k', 'b', '-n']),
+    ('/suggest_scales', {'keybox': 'b', 'usr_txt': 'Dm7\nG7\nC▵7'},
+     ['-w', '-m', 'suggest_scales', '-k', 'b']),
+    ('/chord_fingerboard', {'keybox': 'b', 'instruments': 'guitar', 'usr_txt': 'Dm7\nG7\nC▵7'},
+     ['-w', '-m', 'print_chord_fingerboard', '-ins', 'guitar', '-k', 'b', '-n']),
+    ('/scale_fingerboard', {'keybox': 'b', 'instruments': 'guitar', 'usr_txt': 'C major\nA minor pentatonic'},
+     ['-w', '-m', 'print_scale_fingerboard', '-ins', 'guitar', '-k', 'b']),
+]
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Flask requests per second benchmark',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-r', '--requests', help='Number of requests per route', metavar='int', type=int, default=200)
+
+    parser.add_argument(
+        '-s', '--subprocess_requests', help='Number of requests per route for the spawn per request baseline',
+        metavar='int', type=int, default=20)
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def bench_in_process(number, cached):
+    """
+    Requests per second of each route through the flask test client
+    Every request posts the same form data, so unless cached the response cache is cleared before each request and
+    tune_tools runs every time, cached times the response cache hits (create_chord_chart is random and never cached)
+    """
+    import app
+    client = app.app.test_client()
+    # memory tier only
+    app.response_cache.dirname = None
+    result = {}
+    for route, data, _ in REQUESTS:
+        client.post(route, data=data)
+        start = time.perf_counter()
+        for _ in range(number):
+            if not cached:
+                app.response_cache.entries.clear()
+            client.post(route, data=data)
+        result[route] = number / (time.perf_counter() - start)
+    return result
+
+
+# --------------------------------------------------
+def bench_subprocess(number):
+    """Requests per second of each route when every request spawns tune-tools.py like the old app"""
+    script = os.path.join(ROOT, 'src', 'tune-tools.py')
+    result = {}
+    for route, data, cli_args in REQUESTS:
+        start = time.perf_counter()
+        for _ in range(number):
+            subprocess.run([sys.executable, script, '-i', data['usr_txt']] + cli_args, capture_output=True,
+                           check=True)
+        result[route] = number / (time.perf_counter() - start)
+    return result
+
+
+# --------------------------------------------------
+def main():
+    """Print requests per second per route"""
+    args = get_args()
+    spawn = bench_subprocess(args.subprocess_requests)
+    in_process = bench_in_process(args.requests, cached=False)
+    cached = bench_in_process(args.requests, cached=True)
+    print(f"{'route':<22}{'spawn req/s':>14}{'in process req/s':>20}{'speedup':>10}{'cached req/s':>16}")
+    for route, _, _ in REQUESTS:
+        print(f'{route:<22}{spawn[route]:>14.1f}{in_process[route]:>20.1f}{in_process[route] / spawn[route]:>9.1f}x'
+              f'{cached[route]:>16.1f}')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
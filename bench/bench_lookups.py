@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Per lookup cost of the chromatic number helpers, linear scan of the rows vs the ChromaticNumbers indexes
+
+run:
+python3 bench/bench_lookups.py -n 100000
+"""
+
+import os
+import argparse
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import tune_tools
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Chromatic number lookup benchmark',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-n', '--number', help='Number of lookups to time per helper', metavar='int', type=int, default=100000)
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def scan_chrom_number(chro_num_list, note_str):
+    """The linear scan get_chrom_number used before the indexes"""
+    for c in chro_num_list:
+        if c['note_string_flat'] == note_str or c['note_string_sharp'] == note_str:
+            return int(c['chromatic_number'])
+
+
+# --------------------------------------------------
+def scan_chrom_note(chro_num_list, chrom_number, key_arg):
+    """The linear scan get_chrom_note used before the indexes"""
+    for c in chro_num_list:
+        if c['chromatic_number'] == str(chrom_number):
+            if key_arg == 'b':
+                return c['note_string_flat']
+            else:
+                return c['note_string_sharp']
+
+
+# --------------------------------------------------
+def scan_chrom_from_chord_num(notation_str, chro_num_list):
+    """The linear scan get_chrom_from_chord_num used before the indexes"""
+    for c in chro_num_list:
+        chord_numbers = c['chord_number_string'].split("|")
+        if notation_str in chord_numbers:
+            return c['chromatic_number']
+
+
+# --------------------------------------------------
+def main():
+    """Print the nanoseconds per lookup of each helper"""
+    args = get_args()
+    chro_num_list = tune_tools.Resources().chro_num_list
+    # the scans read the tsv rows as they were kept before the indexes
+    rows = tune_tools.read_tsv(os.path.join(tune_tools.RESOURCES_DIR, 'chromatic_numbers.tsv'))
+    notes = ['C', 'F#', 'Ab', 'B']
+    numbers = [1, 7, 9, 12]
+    notations = ['1', 'b3', '#11', '7']
+    cases = [
+        ('get_chrom_number',
+         lambda: [scan_chrom_number(rows, n) for n in notes],
+         lambda: [tune_tools.get_chrom_number(chro_num_list, n) for n in notes]),
+        ('get_chrom_note',
+         lambda: [scan_chrom_note(rows, n, 'b') for n in numbers],
+         lambda: [tune_tools.get_chrom_note(chro_num_list, n, 'b') for n in numbers]),
+        ('get_chrom_from_chord_num',
+         lambda: [scan_chrom_from_chord_num(n, rows) for n in notations],
+         lambda: [tune_tools.get_chrom_from_chord_num(n, chro_num_list) for n in notations]),
+    ]
+    loops = max(args.number // 4, 1)
+    print(f"{'helper':<26}{'scan ns':>10}{'index ns':>10}{'speedup':>10}")
+    for name, scan, index in cases:
+        scan_ns = timeit.timeit(scan, number=loops) / (loops * 4) * 1e9
+        index_ns = timeit.timeit(index, number=loops) / (loops * 4) * 1e9
+        print(f'{name:<26}{scan_ns:>10.0f}{index_ns:>10.0f}{scan_ns / index_ns:>9.1f}x')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
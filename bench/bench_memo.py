@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Time of the chord main functions over a 500 bar chart, computing every bar vs once per distinct chord
+
+run:
+python3 bench/bench_memo.py -b 500 -r 5
+"""
+
+import os
+import argparse
+import sys
+import random
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+
+# Progressions a lead sheet is made of: ii-V-I in a few keys, a blues and a minor ii-V-i turnaround
+PROGRESSIONS = [
+    ['Dm7', 'G7', 'C▵7', 'C▵7'],
+    ['Gm7', 'C7', 'F▵7', 'F▵7'],
+    ['Cm7', 'F7', 'Bb▵7', 'Bb▵7'],
+    ['F7', 'Bb7', 'F7', 'F7', 'Bb7', 'Bb7', 'F7', 'D7', 'Gm7', 'C7', 'F7', 'C7'],
+    ['Em7b5', 'A7b9', 'Dm7', 'Dm7'],
+    ['C▵7', 'A7', 'Dm7', 'G/B'],
+]
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Per chord memoization benchmark',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-b', '--bars', help='Number of bars in the chart', metavar='int', type=int, default=500)
+
+    parser.add_argument(
+        '-r', '--repeats', help='Number of timed runs, the best is reported', metavar='int', type=int, default=5)
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def make_chart(bars):
+    """A chart of bars chords made of random progressions, seeded so every run times the same chart"""
+    rng = random.Random(0)
+    chart = []
+    while len(chart) < bars:
+        chart.extend(rng.choice(PROGRESSIONS))
+    return chart[:bars]
+
+
+# --------------------------------------------------
+def run_chart(main_arg, chart, resources, memo):
+    """Run main_arg on each bar like stream_main does, with one chord_memo for the chart or none"""
+    chord_memo = {} if memo else None
+    return [tune_tools.run_main_line(main_arg=main_arg, line=line, resources=resources, key_arg='b',
+                                     instrument_arg='guitar', chord_memo=chord_memo) for line in chart]
+
+
+# --------------------------------------------------
+def best_time(func, repeats):
+    """Best wall time of repeats calls, and the result of the last"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        res = func()
+        t = time.perf_counter() - start
+        best = t if best is None or t < best else best
+    return best, res
+
+
+# --------------------------------------------------
+def main():
+    """Print ms per chart with and without memoization per main function"""
+    args = get_args()
+    resources = tune_tools.Resources()
+    chart = make_chart(args.bars)
+    print(f'{len(chart)} bars, {len(set(chart))} distinct chords')
+    print(f"{'main function':<26}{'every bar ms':>14}{'memo ms':>10}{'speedup':>10}")
+    for main_arg in ['get_chord_notes', 'suggest_scales', 'print_chord_fingerboard']:
+        plain, plain_res = best_time(lambda: run_chart(main_arg, chart, resources, False), args.repeats)
+        memo, memo_res = best_time(lambda: run_chart(main_arg, chart, resources, True), args.repeats)
+        if plain_res != memo_res:
+            sys.exit(f'{main_arg} results differ with memoization')
+        print(f'{main_arg:<26}{plain * 1000:>14.2f}{memo * 1000:>10.2f}{plain / memo:>9.1f}x')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
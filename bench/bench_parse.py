@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Chord chart parsing throughput, two regex searches per chord vs the compiled chart tokenizer
+
+run:
+python3 bench/bench_parse.py -b 500 -r 5
+"""
+
+import os
+import argparse
+import sys
+import re
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+from bench_memo import make_chart
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Chord chart parsing benchmark',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-b', '--bars', help='Number of bars in the chart', metavar='int', type=int, default=500)
+
+    parser.add_argument(
+        '-r', '--repeats', help='Number of timed runs, the best is reported', metavar='int', type=int, default=5)
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def regex_parse_printed_chord(input_chord, chro_num_list):
+    """The slash chord search then catch-all search parse_printed_chord used before the tokenizer"""
+    bass_note = ''
+    match = re.search(
+        r"(C#|Cb|C|Db|D#|D|Eb|E|F#|F|Gb|G#|G|Ab|A#|A|Bb|B)/(C#|Cb|C|Db|D#|D|Eb|E|F#|F|Gb|G#|G|Ab|A#|A|Bb|B)",
+        input_chord)
+    if match:
+        note_str = match.group(1)
+        chord_name = ''
+        bass_note = match.group(2)
+    else:
+        match2 = re.search(r"(C#|Cb|C|Db|D#|D|Eb|E|F#|F|Gb|G#|G|Ab|A#|A|Bb|B)(.*)", input_chord)
+        note_str = match2.group(1)
+        chord_name = match2.group(2)
+    if chord_name == '':
+        chord_name = ' '
+    chrom_note = tune_tools.get_chrom_number(chro_num_list=chro_num_list, note_str=note_str)
+    return {'chord_name': chord_name, 'chrom_note': int(chrom_note), 'bass_note': bass_note}
+
+
+# --------------------------------------------------
+def regex_parse_chart(text, chro_num_list):
+    """Split the chart on bar lines and spaces and parse every chord with the two regexes"""
+    result_list = []
+    for line in text.splitlines():
+        for bar in line.split('|'):
+            for symbol in bar.split():
+                chord = regex_parse_printed_chord(input_chord=symbol, chro_num_list=chro_num_list)
+                chord['input'] = symbol
+                result_list.append(chord)
+    return result_list
+
+
+# --------------------------------------------------
+def best_time(func, repeats):
+    """Best wall time of repeats calls, and the result of the last"""
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        res = func()
+        t = time.perf_counter() - start
+        best = t if best is None or t < best else best
+    return best, res
+
+
+# --------------------------------------------------
+def main():
+    """Print chords parsed per second by each parser"""
+    args = get_args()
+    chro_num_list = tune_tools.Resources().chro_num_list
+    chart = make_chart(args.bars)
+    # four bars a line like a lead sheet
+    text = '\n'.join('| ' + ' | '.join(chart[i:i + 4]) + ' |' for i in range(0, len(chart), 4))
+    regex, regex_res = best_time(lambda: regex_parse_chart(text, chro_num_list), args.repeats)
+    tokenizer, tokenizer_res = best_time(lambda: tune_tools.parse_chord_chart(text, chro_num_list), args.repeats)
+    if regex_res != tokenizer_res:
+        sys.exit('The parsers disagree')
+    print(f'{len(chart)} bars, {len(set(chart))} distinct chords')
+    print(f"{'parser':<12}{'ms':>10}{'chords/s':>14}")
+    print(f"{'regex':<12}{regex * 1000:>10.2f}{len(chart) / regex:>14.0f}")
+    print(f"{'tokenizer':<12}{tokenizer * 1000:>10.2f}{len(chart) / tokenizer:>14.0f}")
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Cold start time of tune-tools.py for each main function, with and without the resource bundle, against
+tune-tools.py at a baseline commit (the first commit by default), as the wall time of the whole process and the in
+process time to load the resources and run
+
+run:
+python3 bench/bench_startup.py -r 20
+"""
+
+import os
+import argparse
+import io
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import tune_tools
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SRC = os.path.join(ROOT, 'src')
+BUNDLE = os.path.join(SRC, 'resources', 'resources.bundle')
+
+RUNS = [
+    ('create_chord_chart', ['-i', 'input/notes/1.txt', '-m', 'create_chord_chart', '-k', 'b']),
+    ('get_chord_notes', ['-i', 'input/chords/1.txt', '-m', 'get_chord_notes', '-k', 'b']),
+    ('suggest_scales', ['-i', 'input/chords/1.txt', '-m', 'suggest_scales', '-k', 'b']),
+    ('print_chord_fingerboard', ['-i', 'input/chords/2.txt', '-m', 'print_chord_fingerboard', '-ins', 'guitar']),
+    ('print_scale_fingerboard', ['-i', 'input/scales/1.txt', '-m', 'print_scale_fingerboard', '-ins', 'guitar']),
+]
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='tune-tools.py cold start benchmark',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-r', '--runs', help='Number of runs per main function', metavar='int', type=int, default=20)
+
+    parser.add_argument(
+        '-b', '--baseline', help='Commit to compare against, the first commit when not given', metavar='str',
+        type=str, default='')
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def extract_baseline(rev, dirname):
+    """Write src/ of a commit to a directory, returns the commit and its src directory"""
+    if not rev:
+        rev = subprocess.run(['git', 'rev-list', '--max-parents=0', 'HEAD'], cwd=ROOT, capture_output=True,
+                             text=True, check=True).stdout.split()[0]
+    archive = subprocess.run(['git', 'archive', '--format=tar', rev, 'src'], cwd=ROOT, capture_output=True,
+                             check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dirname)
+    return rev[:7], os.path.join(dirname, 'src')
+
+
+# --------------------------------------------------
+def time_runs(cli_args, runs, src_list):
+    """
+    Median wall time in ms of running tune-tools.py with the arguments from each src directory, one run of each
+    in turn so drift in the machine load hits them alike
+    """
+    # Time a normal install where the bytecode of tune_tools is cached
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    times = [[] for _ in src_list]
+    for i in range(runs + 1):
+        for src, src_times in zip(src_list, times):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, 'tune-tools.py'] + cli_args, cwd=src, env=env, capture_output=True,
+                           check=True)
+            # the first run writes the bytecode
+            if i:
+                src_times.append((time.perf_counter() - start) * 1000)
+    return [statistics.median(src_times) for src_times in times]
+
+
+# --------------------------------------------------
+def time_in_process(cli_args, runs, use_bundle):
+    """Median time in ms to load fresh Resources and run the main function in process"""
+    args = dict(zip(cli_args[::2], cli_args[1::2]))
+    with open(os.path.join(SRC, args['-i'])) as file:
+        input_list = [line.strip() for line in file]
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        resources = tune_tools.Resources(use_bundle=use_bundle)
+        tune_tools.run_main(main_arg=args['-m'], input_list=input_list, resources=resources,
+                            key_arg=args.get('-k', 'b'), weights_arg=True, instrument_arg=args.get('-ins', ''))
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+# --------------------------------------------------
+def main():
+    """Print the median cold start per main function"""
+    args = get_args()
+    with tempfile.TemporaryDirectory() as dirname:
+        rev, baseline_src = extract_baseline(rev=args.baseline, dirname=dirname)
+        # Build the bundle and suggest_scales table, and time a copy of src without the bundle alongside
+        subprocess.run([sys.executable, 'tune-tools.py', '-b'], cwd=SRC, check=True)
+        tsv_src = os.path.join(dirname, 'tsv')
+        shutil.copytree(SRC, tsv_src, ignore=shutil.ignore_patterns(os.path.basename(BUNDLE), '__pycache__'))
+        wall = {name: time_runs(cli_args, args.runs, [baseline_src, tsv_src, SRC]) for name, cli_args in RUNS}
+    print(f"{'main function':<26}{rev + ' ms':>12}{'tsv ms':>10}{'bundle ms':>12}{'in process tsv ms':>20}"
+          f"{'bundle ms':>12}")
+    for name, cli_args in RUNS:
+        print(f'{name:<26}{wall[name][0]:>12.1f}{wall[name][1]:>10.1f}{wall[name][2]:>12.1f}'
+              f'{time_in_process(cli_args, args.runs, False):>20.2f}{time_in_process(cli_args, args.runs, True):>12.2f}')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
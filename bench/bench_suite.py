@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Benchmark suite over every main function, the command line cold start and the flask app,
+written as JSON and compared against a saved baseline to catch regressions
+
+run:
+python3 bench/bench_suite.py --save
+python3 bench/bench_suite.py -o results.json
+python3 bench/bench_suite.py -q -r 3 -t 1.5
+"""
+
+import os
+import argparse
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SRC = os.path.join(ROOT, 'src')
+sys.path.insert(0, SRC)
+sys.path.insert(0, os.path.join(ROOT, 'bench'))
+import tune_tools
+
+BASELINE_FILE = os.path.join(ROOT, 'bench', 'baseline.json')
+# Bump when the cases change so old baselines are not compared against
+SUITE_VERSION = 1
+INSTRUMENTS = list(tune_tools.FRETBOARD_LAYOUTS)
+# Fast cases are looped so a sample is long enough for the timer and scheduler noise to wash out
+MIN_SAMPLE_MS = 20
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='tune-tools benchmark suite',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-r', '--repeats', help='Number of timed runs per case, the fastest is compared', metavar='int', type=int,
+        default=7)
+
+    parser.add_argument(
+        '-q', '--quick', help='A boolean flag to skip the command line cold start and flask cases',
+        action='store_true')
+
+    parser.add_argument(
+        '-o', '--output', help='File to write the JSON results to, - for stdout', metavar='str', type=str,
+        default='-')
+
+    parser.add_argument(
+        '-b', '--baseline', help='Saved results to compare against', metavar='str', type=str, default=BASELINE_FILE)
+
+    parser.add_argument(
+        '-t', '--threshold', help='Slowdown ratio against the baseline reported as a regression', metavar='float',
+        type=float, default=1.25)
+
+    parser.add_argument(
+        '--save', help='A boolean flag to save the results as the baseline', action='store_true')
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def read_lines(file_name):
+    """Stripped lines of an input file under src/"""
+    with open(os.path.join(SRC, file_name), encoding='utf-8') as file:
+        return [line.strip() for line in file if line.strip()]
+
+
+# --------------------------------------------------
+def every_chord(resources):
+    """Every chord name of chords.tsv on each of the 12 roots as a written chord symbol"""
+    chord_list = []
+    for chord_name in resources.chords_list.chrom_list_by_name:
+        if chord_name.startswith('/'):
+            continue
+        for transp_int in range(0, 12):
+            res = tune_tools.get_chord_label_notes(chord_name=chord_name, transp_int=transp_int,
+                                                   chords_list=resources.chords_list,
+                                                   chro_num_list=resources.chro_num_list, key_arg='b')
+            chord_list.append(res['label'].strip())
+    return chord_list
+
+
+# --------------------------------------------------
+def long_note_list(resources, lines):
+    """Seeded lines of 1-4 notes taken from random chords, so every line has a chord"""
+    rng = random.Random(0)
+    chord_list = every_chord(resources)
+    note_list = []
+    for _ in range(lines):
+        res = tune_tools.get_chord_notes(input_list=[rng.choice(chord_list)], chro_num_list=resources.chro_num_list,
+                                         chords_list=resources.chords_list, key_arg='b')[0]
+        note_list.append(' '.join(rng.sample(res['note_list'], rng.randint(1, min(4, len(res['note_list']))))))
+    return note_list
+
+
+# --------------------------------------------------
+def every_scale(resources):
+    """Every scale of scales.tsv on each of the 12 roots"""
+    roots = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+    return [f'{root} {s.name}' for s in resources.scales_list for root in roots]
+
+
+# --------------------------------------------------
+def every_mode(resources):
+    """Every mode of modes.tsv on each of the 12 roots"""
+    roots = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+    return [f'{root} {m.name}' for m in resources.modes_list for root in roots]
+
+
+# --------------------------------------------------
+def library_cases(resources):
+    """(case name, number of inputs, function running it) of each main function in process"""
+    notes_short = read_lines('input/notes/1.txt')
+    notes_long = long_note_list(resources, 2000)
+    chords = every_chord(resources)
+    scales = every_scale(resources)
+    modes = every_mode(resources)
+    # the chords of the long note list in charts of 32 bars
+    chart = [c['label'] for c in tune_tools.run_main_results(main_arg='create_chord_chart', input_list=notes_long,
+                                                             resources=resources, key_arg='b', seed=0)]
+    progressions = [' | '.join(chart[i:i + 32]) for i in range(0, len(chart), 32)]
+
+    def run(main_arg, input_list, **kwargs):
+        return lambda: tune_tools.run_main(main_arg=main_arg, input_list=input_list, resources=resources,
+                                           key_arg='b', **kwargs)
+
+    def suggest_search():
+        # suggest_scales worked out for every chord, the way inputs under SUGGEST_SCALES_TABLE_MIN_CHORDS run
+        for record in tune_tools.stream_main(main_arg='suggest_scales', lines=chords, resources=resources,
+                                             key_arg='b', load_suggest_scales_table=False):
+            pass
+
+    def voicing_search():
+        # clear the voicings cached on the fingerboard so every search runs
+        resources.fingerboard_list('guitar7', frets=24).voicing_cache.clear()
+        tune_tools.run_main(main_arg='find_chord_voicings', input_list=chords[:50], resources=resources, key_arg='b',
+                            instrument_arg='guitar7', frets_arg=24)
+
+    def voice_leading(cold):
+        # the candidates of the chords stay cached on the fingerboard unless cold, the voice leading runs every time
+        def run_voice_leading():
+            if cold:
+                resources.fingerboard_list('guitar7', frets=24).voicing_cache.clear()
+            tune_tools.run_main(main_arg='optimize_voice_leading', input_list=[' | '.join(chart[:100])],
+                                resources=resources, key_arg='b', instrument_arg='guitar7', frets_arg=24)
+        return run_voice_leading
+
+    cases = [
+        ('create_chord_chart short', len(notes_short), run('create_chord_chart', notes_short, seed=0)),
+        ('create_chord_chart short -w', len(notes_short), run('create_chord_chart', notes_short, seed=0,
+                                                              weights_arg=True)),
+        ('create_chord_chart long', len(notes_long), run('create_chord_chart', notes_long, seed=0)),
+        ('create_chord_chart long -w', len(notes_long), run('create_chord_chart', notes_long, seed=0,
+                                                            weights_arg=True)),
+        ('get_chord_notes every chord', len(chords), run('get_chord_notes', chords)),
+        ('suggest_scales every chord', len(chords), run('suggest_scales', chords)),
+        ('suggest_scales every chord no table', len(chords), suggest_search),
+        ('identify_chords long', len(notes_long), run('identify_chords', notes_long)),
+        ('get_mode_chords every mode', len(modes), run('get_mode_chords', modes)),
+        ('suggest_progression_scales long', len(progressions), run('suggest_progression_scales', progressions)),
+    ]
+    for instrument in INSTRUMENTS:
+        cases.append((f'print_chord_fingerboard {instrument}', len(chords),
+                      run('print_chord_fingerboard', chords, instrument_arg=instrument)))
+        cases.append((f'print_scale_fingerboard {instrument}', len(scales),
+                      run('print_scale_fingerboard', scales, instrument_arg=instrument)))
+    cases.append(('find_chord_voicings guitar7 24 frets', len(chords[:50]), voicing_search))
+    cases.append(('optimize_voice_leading 100 bars', 1, voice_leading(cold=False)))
+    cases.append(('optimize_voice_leading 100 bars cold', 1, voice_leading(cold=True)))
+    return cases
+
+
+# --------------------------------------------------
+def time_case(func, repeats):
+    """Fastest and median wall time in ms of one call, each of repeats samples looping for at least MIN_SAMPLE_MS"""
+    start = time.perf_counter()
+    func()
+    loops = max(1, math.ceil(MIN_SAMPLE_MS / max((time.perf_counter() - start) * 1000, 0.001)))
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        times.append((time.perf_counter() - start) * 1000 / loops)
+    return min(times), statistics.median(times)
+
+
+# --------------------------------------------------
+def cli_cold_start_case():
+    """Run tune-tools.py like a user would, with the bytecode of tune_tools cached"""
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    cli_args = [sys.executable, 'tune-tools.py', '-i', 'input/chords/1.txt', '-m', 'get_chord_notes', '-k', 'b']
+    return lambda: subprocess.run(cli_args, cwd=SRC, env=env, capture_output=True, check=True)
+
+
+# --------------------------------------------------
+def flask_cases():
+    """(case name, number of requests, function posting them) of each form route through the flask test client"""
+    import app
+    from bench_flask import REQUESTS
+    client = app.app.test_client()
+    # memory tier only, it is cleared before each request
+    app.response_cache.dirname = None
+    number = 50
+    cases = []
+    for route, data, _ in REQUESTS:
+        def post(route=route, data=data):
+            # clear the response cache so every request runs tune_tools
+            for _ in range(number):
+                app.response_cache.entries.clear()
+                client.post(route, data=data)
+        cases.append((f'flask {route}', number, post))
+    return cases
+
+
+# --------------------------------------------------
+def run_suite(repeats, quick):
+    """Time every case, returns the results dict written as JSON"""
+    resources = tune_tools.Resources()
+    cases = library_cases(resources)
+    if not quick:
+        cases.append(('cli cold start get_chord_notes', 1, cli_cold_start_case()))
+        sys.path.insert(0, os.path.join(ROOT, 'flask'))
+        cases.extend(flask_cases())
+    results = {}
+    for name, count, func in cases:
+        best, median = time_case(func, repeats)
+        results[name] = {'ms': round(best, 3), 'median_ms': round(median, 3), 'count': count,
+                         'us_per_input': round(best * 1000 / count, 3)}
+        print(f'{name:<42}{best:>10.2f} ms', file=sys.stderr)
+    return {'version': SUITE_VERSION, 'python': platform.python_version(), 'platform': platform.platform(),
+            'repeats': repeats, 'results': results}
+
+
+# --------------------------------------------------
+def compare(data, baseline, threshold):
+    """Print the ratio of each case to the baseline, returns the names of the cases slower than threshold"""
+    regression_list = []
+    print(f"{'case':<42}{'baseline ms':>13}{'ms':>10}{'ratio':>8}", file=sys.stderr)
+    for name, res in data['results'].items():
+        base = baseline['results'].get(name)
+        if base is None:
+            continue
+        ratio = res['ms'] / base['ms'] if base['ms'] else float('inf')
+        flag = ''
+        if ratio > threshold:
+            regression_list.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:<42}{base['ms']:>13.2f}{res['ms']:>10.2f}{ratio:>7.2f}x{flag}", file=sys.stderr)
+    return regression_list
+
+
+# --------------------------------------------------
+def main():
+    """Run the suite, write the results and exit 1 on a regression against the baseline"""
+    args = get_args()
+    data = run_suite(repeats=args.repeats, quick=args.quick)
+    text = json.dumps(data, indent=2)
+    if args.output == '-':
+        print(text)
+    else:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as file:
+            file.write(text + '\n')
+        return
+    try:
+        with open(args.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+    except OSError:
+        print(f'No baseline at {args.baseline}, save one with --save', file=sys.stderr)
+        return
+    if baseline.get('version') != SUITE_VERSION:
+        sys.exit(f'Baseline {args.baseline} is from another version of the suite, save a new one with --save')
+    regression_list = compare(data=data, baseline=baseline, threshold=args.threshold)
+    if regression_list:
+        sys.exit(f'{len(regression_list)} case(s) over {args.threshold}x the baseline: {", ".join(regression_list)}')
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Load test the flask JSON API with concurrent clients, reports p50/p99 latency per route uncached, each
+request with input chords of its own that the response cache has not seen, and cached, the same body every time
+
+run:
+python3 bench/load_api.py --start -c 16 -r 500
+python3 bench/load_api.py -u http://127.0.0.1:5000 -c 16 -r 500
+"""
+
+import os
+import argparse
+import csv
+import sys
+import subprocess
+import time
+import json
+import random
+import statistics
+import urllib.request
+import urllib.error
+import concurrent.futures
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# (route, JSON body, whether uncached requests draw their own input chords), create_chord_chart without a seed is
+# never cached so its body stays the same
+REQUESTS = [
+    ('/api/chords', {'input': ['A', 'A C', 'C E G', 'D F A C'], 'key': 'b'}, False),
+    ('/api/chord-notes', {'input': ['Dm7', 'G7', 'C▵7', 'A7b9'], 'key': 'b'}, True),
+    ('/api/scales', {'input': ['Dm7', 'G7', 'C▵7', 'A7b9'], 'key': 'b'}, True),
+    ('/api/fingerboard', {'input': ['Dm7', 'G7', 'C▵7'], 'key': 'b', 'instrument': 'guitar'}, True),
+    ('/api/scales', {'input': ['Dm7', 'G7', 'C▵7', 'A7b9'] * 100, 'key': 'b'}, True),
+]
+ROOTS = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Flask JSON API load test',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-u', '--url', help='Base url of the running app', metavar='str', type=str, default='http://127.0.0.1:5000')
+
+    parser.add_argument(
+        '-c', '--clients', help='Number of concurrent clients', metavar='int', type=int, default=16)
+
+    parser.add_argument(
+        '-r', '--requests', help='Number of requests per route', metavar='int', type=int, default=500)
+
+    parser.add_argument(
+        '--start', help='A boolean flag to start flask/app.py for the test and stop it after', action='store_true')
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def post(url, body):
+    """POST a JSON body, returns the latency in seconds"""
+    data = json.dumps(body).encode('utf-8')
+    req = urllib.request.Request(url, data=data, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    with urllib.request.urlopen(req) as response:
+        response.read()
+    return time.perf_counter() - start
+
+
+# --------------------------------------------------
+def read_chord_symbols():
+    """Every chord name of chords.tsv on each of the 12 roots"""
+    with open(os.path.join(ROOT, 'src', 'resources', 'chords.tsv'), encoding='utf-8') as file:
+        name_list = [row['name'] for row in csv.DictReader(file, delimiter='\t')]
+    return [f'{root}{name}'.strip() for name in name_list for root in ROOTS]
+
+
+# --------------------------------------------------
+def request_bodies(body, vary, number, chord_symbols, rng):
+    """
+    The bodies of number requests to a route, when vary each with as many input chords drawn at random as the
+    body has, so the requests miss the response cache of the app, also for a second run against the same app
+    """
+    if not vary:
+        return [body] * number
+    return [dict(body, input=rng.choices(chord_symbols, k=len(body['input']))) for _ in range(number)]
+
+
+# --------------------------------------------------
+def wait_for_server(url, timeout=30):
+    """Wait until the app answers, exits if it does not within timeout seconds"""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            post(url + '/api/chord-notes', {'input': ['C']})
+            return
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.1)
+    sys.exit(f'No answer from {url} after {timeout}s')
+
+
+# --------------------------------------------------
+def load_route(url, body_list, clients):
+    """Latencies of a request to a route with each body sent by clients concurrent clients, and the wall time"""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=clients) as executor:
+        start = time.perf_counter()
+        latency_list = list(executor.map(lambda body: post(url, body), body_list))
+    return latency_list, time.perf_counter() - start
+
+
+# --------------------------------------------------
+def percentile(sorted_list, p):
+    """Nearest rank percentile of a sorted list"""
+    return sorted_list[min(len(sorted_list) - 1, max(0, round(p / 100 * len(sorted_list)) - 1))]
+
+
+# --------------------------------------------------
+def main():
+    """Print p50/p99 latency, mean latency and requests per second per route, uncached then cached"""
+    args = get_args()
+    chord_symbols = read_chord_symbols()
+    # not seeded, so bodies of an earlier run against the same app are not drawn again
+    rng = random.Random()
+    server = None
+    if args.start:
+        server = subprocess.Popen([sys.executable, 'app.py'], cwd=os.path.join(ROOT, 'flask'),
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(args.url)
+        print(f"{'':<27}{'uncached':<40}{'cached'}")
+        print(f"{'route':<20}{'lines':>7}" + f"{'p50 ms':>10}{'p99 ms':>10}{'mean ms':>10}{'req/s':>10}" * 2)
+        for route, body, vary in REQUESTS:
+            row = f"{route:<20}{len(body['input']):>7}"
+            # warm up the route (and the worker pool of large batches) with a body of each run, the cached run
+            # times the same body as its warm up request
+            for body_list in (request_bodies(body=body, vary=vary, number=args.requests + 1,
+                                             chord_symbols=chord_symbols, rng=rng), [body] * (args.requests + 1)):
+                post(args.url + route, body_list[0])
+                latency_list, wall = load_route(url=args.url + route, body_list=body_list[1:], clients=args.clients)
+                latency_list.sort()
+                row += (f'{percentile(latency_list, 50) * 1000:>10.2f}{percentile(latency_list, 99) * 1000:>10.2f}'
+                        f'{statistics.mean(latency_list) * 1000:>10.2f}{args.requests / wall:>10.1f}')
+            print(row)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -1,8 +1,314 @@
-from flask import Flask, render_template, request
-import subprocess
+from flask import Flask, render_template, request, jsonify
+import collections
+import hashlib
+import json
+import os
+import signal
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+import tune_tools
 
 app = Flask(__name__)
 
+# Resource tables are parsed once per worker and shared by every request
+resources = tune_tools.Resources()
+
+
+# Bump when the responses change so the disk tier of the response cache is not reused
+RESPONSE_CACHE_VERSION = 1
+# Responses kept in memory
+RESPONSE_CACHE_SIZE = 2048
+
+
+class ResponseCache:
+    """
+    LRU cache of responses in memory, with an optional tier of JSON files in a local directory
+    (set TUNE_TOOLS_CACHE_DIR) that outlives the process and is shared between workers
+    Keys are tuples of JSON values, values anything JSON serializable
+    """
+
+    def __init__(self, maxsize=RESPONSE_CACHE_SIZE, dirname=None, namespace=''):
+        self.maxsize = maxsize
+        self.dirname = dirname
+        self.namespace = namespace
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.counters = {'hits': 0, 'disk_hits': 0, 'misses': 0}
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+
+    def file_path(self, key):
+        """Disk tier file of a key, named by a hash of the key and namespace"""
+        digest = hashlib.sha256(json.dumps([self.namespace, key], ensure_ascii=False).encode('utf-8')).hexdigest()
+        return os.path.join(self.dirname, f'{digest}.json')
+
+    def get(self, key):
+        """The cached value of key or None"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.counters['hits'] += 1
+                return self.entries[key]
+        value = None
+        if self.dirname:
+            try:
+                with open(self.file_path(key), encoding='utf-8') as file:
+                    value = json.load(file)
+            except (OSError, ValueError):
+                value = None
+        with self.lock:
+            if value is None:
+                self.counters['misses'] += 1
+            else:
+                self.counters['disk_hits'] += 1
+                self.store(key, value)
+        return value
+
+    def put(self, key, value):
+        """Cache value for key in memory and on disk"""
+        with self.lock:
+            self.store(key, value)
+        if self.dirname:
+            file_path = self.file_path(key)
+            # Written to a temporary file and renamed so concurrent readers never see a partial file
+            tmp_path = f'{file_path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as file:
+                json.dump(value, file, ensure_ascii=False)
+            os.replace(tmp_path, file_path)
+
+    def store(self, key, value):
+        """Add to the memory tier, call with the lock held"""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def stats(self):
+        """Hit and miss counters and the number of responses in memory"""
+        with self.lock:
+            return dict(self.counters, size=len(self.entries), maxsize=self.maxsize, disk=bool(self.dirname))
+
+
+# Responses of the deterministic modes, and of create_chord_chart when seeded, for this version of the resources
+response_cache = ResponseCache(dirname=os.environ.get('TUNE_TOOLS_CACHE_DIR'), namespace=[
+    RESPONSE_CACHE_VERSION, tune_tools.resource_hash(resources.dirname, tune_tools.RESOURCE_FILES)])
+
+
+# Phases and counters of the tune_tools runs of every request since the app started, served at /api/metrics
+metrics = tune_tools.Profile()
+metrics_lock = threading.Lock()
+
+
+def record_metrics(profile):
+    """Add the Profile of a tune_tools run to the app metrics"""
+    with metrics_lock:
+        metrics.merge(profile)
+
+
+def normalize_input(user_input):
+    """The stripped lines of a text box or API input, the part of the input the output depends on"""
+    return [i.strip() for i in str(user_input).splitlines()]
+
+
+def run_tune_tools(main_arg, user_input, key, instrument=''):
+    """Run a tune_tools main function in process, returns the output or error message as a list of lines"""
+    input_list = normalize_input(user_input)
+    # create_chord_chart picks random chords, the forms have no seed so its charts are never cached
+    cache_key = None
+    if main_arg != 'create_chord_chart':
+        cache_key = ('page', main_arg, tuple(input_list), key, instrument)
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+    with tune_tools.profiling() as profile:
+        try:
+            out = tune_tools.run_main(main_arg=main_arg, input_list=input_list, resources=resources, key_arg=key,
+                                      weights_arg=True, notes_for_gen_chord_bool_arg=True, instrument_arg=instrument)
+            result_list = out.split('\n')
+        except tune_tools.TuneToolsError as e:
+            result_list = [str(e), '']
+    record_metrics(profile)
+    if cache_key is not None:
+        response_cache.put(cache_key, result_list)
+    return result_list
+
+
+# Largest batch of lines one API request can send
+API_MAX_LINES = 10000
+# Batches of at least this many lines are split across the worker pool, smaller ones run in the request thread
+API_POOL_MIN_LINES = 200
+# Lines per worker pool task
+API_POOL_CHUNK_LINES = 100
+# Worker processes shared by every request, so CPU heavy batches never run more than this many at once
+API_POOL_WORKERS = os.cpu_count() or 1
+api_pool = None
+api_pool_lock = threading.Lock()
+
+
+def get_api_pool():
+    """
+    The process pool for large API batches, started on first use, workers load the resources on import
+    It is started from a request thread, so workers come from a forkserver (spawned where there is none) rather than a
+    fork of this process that could copy a lock held by another request thread
+    """
+    global api_pool
+    with api_pool_lock:
+        if api_pool is None:
+            # imported on first use so an app that never pools does not pay for them
+            import concurrent.futures
+            import multiprocessing
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            api_pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=API_POOL_WORKERS, mp_context=multiprocessing.get_context(start_method))
+    return api_pool
+
+
+def run_api_lines(main_arg, lines, first_line, options):
+    """Records of a chunk of API input lines and the Profile of the run, run in the request thread or a pool worker"""
+    with tune_tools.profiling() as profile:
+        records = list(tune_tools.stream_main(main_arg=main_arg, lines=lines, resources=resources,
+                                              first_line=first_line, **options))
+    return records, profile
+
+
+def get_api_request():
+    """Input lines and tune_tools options from the JSON body of an API request, raises TuneToolsError if invalid"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        raise tune_tools.TuneToolsError('Request body should be a JSON object')
+    input_data = data.get('input', [])
+    if isinstance(input_data, str):
+        input_data = input_data.splitlines()
+    if not isinstance(input_data, list) or not all(isinstance(i, str) for i in input_data):
+        raise tune_tools.TuneToolsError('input should be a string or a list of strings')
+    if not isinstance(data.get('key', 'b'), str) or not isinstance(data.get('instrument', ''), str):
+        raise tune_tools.TuneToolsError('key and instrument should be strings')
+    seed = data.get('seed')
+    # JSON true and false are ints to isinstance
+    if seed is not None and (not isinstance(seed, int) or isinstance(seed, bool)):
+        raise tune_tools.TuneToolsError('seed should be an integer')
+    tuning = data.get('tuning')
+    if tuning is not None and not isinstance(tuning, str):
+        raise tune_tools.TuneToolsError('tuning should be a string of note names from the lowest string up')
+    frets = data.get('frets')
+    if frets is not None and (not isinstance(frets, int) or isinstance(frets, bool)):
+        raise tune_tools.TuneToolsError('frets should be an integer')
+    options = {'key_arg': data.get('key', 'b'), 'weights_arg': bool(data.get('weights', True)),
+               'notes_for_gen_chord_bool_arg': bool(data.get('notes', False)),
+               'instrument_arg': data.get('instrument', ''), 'seed': seed, 'tuning_arg': tuning, 'frets_arg': frets}
+    return data, [i.strip() for i in input_data], options
+
+
+def run_api(main_arg, input_list, options):
+    """
+    Run a tune_tools main function on a batch of input lines
+    Returns the JSON response with one record per line, a bad line gets an error record and does not fail the batch
+    """
+    if len(input_list) > API_MAX_LINES:
+        return jsonify({'error': f'Batches are limited to {API_MAX_LINES} lines'}), 413
+    try:
+        tune_tools.check_main_args(main_arg=main_arg, key_arg=options['key_arg'],
+                                   instrument_arg=options['instrument_arg'], resources=resources,
+                                   tuning_arg=options['tuning_arg'], frets_arg=options['frets_arg'])
+    except tune_tools.TuneToolsError as e:
+        return jsonify({'error': str(e)}), 400
+    # create_chord_chart results are random unless seeded
+    cache_key = None
+    if main_arg != 'create_chord_chart' or options['seed'] is not None:
+        cache_key = ('api', main_arg, tuple(input_list), tuple(sorted(options.items())))
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+    if len(input_list) < API_POOL_MIN_LINES:
+        records, profile = run_api_lines(main_arg=main_arg, lines=input_list, first_line=1, options=options)
+        record_metrics(profile)
+    else:
+        pool = get_api_pool()
+        futures = [pool.submit(run_api_lines, main_arg, input_list[i:i + API_POOL_CHUNK_LINES], i + 1, options)
+                   for i in range(0, len(input_list), API_POOL_CHUNK_LINES)]
+        records = []
+        for future in futures:
+            chunk_records, profile = future.result()
+            records.extend(chunk_records)
+            record_metrics(profile)
+    response = {'results': records}
+    if cache_key is not None:
+        response_cache.put(cache_key, response)
+    return jsonify(response)
+
+
+def api_route(main_arg):
+    """Parse an API request and run main_arg on it, bad request bodies get a 400 response"""
+    try:
+        data, input_list, options = get_api_request()
+    except tune_tools.TuneToolsError as e:
+        return jsonify({'error': str(e)}), 400
+    if main_arg == 'print_fingerboard':
+        fingerboard_type = data.get('type', 'chord')
+        if fingerboard_type not in ('chord', 'scale'):
+            return jsonify({'error': "type should be 'chord' or 'scale'"}), 400
+        main_arg = f'print_{fingerboard_type}_fingerboard'
+    return run_api(main_arg=main_arg, input_list=input_list, options=options)
+
+
+@app.route("/api/chords", methods=["POST"])
+def api_chords():
+    return api_route(main_arg='create_chord_chart')
+
+
+@app.route("/api/chord-notes", methods=["POST"])
+def api_chord_notes():
+    return api_route(main_arg='get_chord_notes')
+
+
+@app.route("/api/scales", methods=["POST"])
+def api_scales():
+    return api_route(main_arg='suggest_scales')
+
+
+@app.route("/api/identify-chords", methods=["POST"])
+def api_identify_chords():
+    return api_route(main_arg='identify_chords')
+
+
+@app.route("/api/mode-chords", methods=["POST"])
+def api_mode_chords():
+    return api_route(main_arg='get_mode_chords')
+
+
+@app.route("/api/progression-scales", methods=["POST"])
+def api_progression_scales():
+    return api_route(main_arg='suggest_progression_scales')
+
+
+@app.route("/api/voicings", methods=["POST"])
+def api_voicings():
+    return api_route(main_arg='find_chord_voicings')
+
+
+@app.route("/api/voice-leading", methods=["POST"])
+def api_voice_leading():
+    return api_route(main_arg='optimize_voice_leading')
+
+
+@app.route("/api/fingerboard", methods=["POST"])
+def api_fingerboard():
+    return api_route(main_arg='print_fingerboard')
+
+
+@app.route("/api/cache-stats", methods=["GET"])
+def api_cache_stats():
+    return jsonify(response_cache.stats())
+
+
+@app.route("/api/metrics", methods=["GET"])
+def api_metrics():
+    with metrics_lock:
+        report = metrics.report()
+    return jsonify(dict(report, response_cache=response_cache.stats()))
+
 
 @app.route("/")
 def home():
@@ -14,16 +320,8 @@ def create_chord_chart():
     if request.method == "POST":
         key = request.form.get('keybox')
         user_input = request.form["usr_txt"]
-        cmd = f"python3 ../src/tune-tools.py -i '{str(user_input)}' -w -m 'create_chord_chart' -k '{key}' -n"
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True)
-        stder = p.stderr.read()
-        out, err = p.communicate()
-        if not stder:
-            result_list = out.split('\n')
-            return render_template("create_chord_chart.html", content=result_list)
-        else:
-            result_list = stder.split('\n')
-            return render_template("create_chord_chart.html", content=result_list)
+        result_list = run_tune_tools(main_arg='create_chord_chart', user_input=user_input, key=key)
+        return render_template("create_chord_chart.html", content=result_list)
     else:
         return render_template("post_create_chord_chart.html")
 
@@ -33,16 +331,8 @@ def suggest_scales():
     if request.method == "POST":
         key = request.form.get('keybox')
         user_input = request.form["usr_txt"]
-        cmd = f"python3 ../src/tune-tools.py -i '{str(user_input)}' -w -m 'suggest_scales' -k '{key}' "
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True)
-        stder = p.stderr.read()
-        out, err = p.communicate()
-        if not stder:
-            result_list = out.split('\n')
-            return render_template("suggest_scales.html", content=result_list)
-        else:
-            result_list = stder.split('\n')
-            return render_template("suggest_scales.html", content=result_list)
+        result_list = run_tune_tools(main_arg='suggest_scales', user_input=user_input, key=key)
+        return render_template("suggest_scales.html", content=result_list)
     else:
         return render_template("post_suggest_scales.html")
 
@@ -53,16 +343,9 @@ def chord_fingerboard():
         instrument = request.form.get('instruments')
         key = request.form.get('keybox')
         user_input = request.form["usr_txt"]
-        cmd = f"python3 ../src/tune-tools.py -i '{str(user_input)}' -w -m 'print_chord_fingerboard' -ins '{instrument}' -k '{key}' -n"
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True)
-        stder = p.stderr.read()
-        out, err = p.communicate()
-        if not stder:
-            result_list = out.split('\n')
-            return render_template("chord_fingerboard.html", content=result_list)
-        else:
-            result_list = stder.split('\n')
-            return render_template("chord_fingerboard.html", content=result_list)
+        result_list = run_tune_tools(main_arg='print_chord_fingerboard', user_input=user_input, key=key,
+                                     instrument=instrument)
+        return render_template("chord_fingerboard.html", content=result_list)
     else:
         return render_template("post_chord_fingerboard.html")
 
@@ -73,19 +356,15 @@ def scale_fingerboard():
         instrument = request.form.get('instruments')
         key = request.form.get('keybox')
         user_input = request.form["usr_txt"]
-        cmd = f"python3 ../src/tune-tools.py -i '{str(user_input)}' -w -m 'print_scale_fingerboard' -ins '{instrument}' -k '{key}' "
-        p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, universal_newlines=True)
-        stder = p.stderr.read()
-        out, err = p.communicate()
-        if not stder:
-            result_list = out.split('\n')
-            return render_template("scale_fingerboard.html", content=result_list)
-        else:
-            result_list = stder.split('\n')
-            return render_template("scale_fingerboard.html", content=result_list)
+        result_list = run_tune_tools(main_arg='print_scale_fingerboard', user_input=user_input, key=key,
+                                     instrument=instrument)
+        return render_template("scale_fingerboard.html", content=result_list)
     else:
         return render_template("post_scale_fingerboard.html")
 
 
 if __name__ == "__main__":
-    app.run(debug=False)
\ No newline at end of file
+    # each request gets its own thread, CPU heavy API batches go to the shared worker pool
+    # exit normally on SIGTERM so the pool and its forkserver are shut down with the interpreter
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    app.run(debug=False, threaded=True)
@@ -0,0 +1,2781 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: Help to create and practice music
+
+Library of the tune-tools main functions, the command line script is tune-tools.py
+
+import with:
+import tune_tools
+resources = tune_tools.Resources()
+tune_tools.run_main(main_arg='suggest_scales', input_list=['Dm7', 'G7'], resources=resources, key_arg='b')
+
+run:
+python3 tune-tools.py -i input/notes/1.txt -w -m 'create_chord_chart' -k b -n
+python3 tune-tools.py -i input/chords/1.txt -w -m 'get_chord_notes' -k b
+python3 tune-tools.py -i input/chords/1.txt -w -m 'suggest_scales' -k b
+python3 tune-tools.py -i input/chords/2.txt -m 'print_chord_fingerboard' -ins 'guitar' -k b
+python3 tune-tools.py -i input/scales/1.txt -m 'print_scale_fingerboard' -ins 'guitar' -k b
+"""
+
+import os
+import argparse
+import sys
+import csv
+import random
+import re
+import itertools
+import functools
+import bisect
+import collections
+import contextlib
+import contextvars
+import threading
+import time
+
+
+# --------------------------------------------------
+def get_args():
+    """get command-line arguments"""
+    parser = argparse.ArgumentParser(
+        description='Argparse Python script',
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+
+    parser.add_argument(
+        '-i',
+        '--input',
+        help='Input txt file or string where each line is a space delimited list of notes to generate chords with, '
+             'or chord name and symbol to get the notes of',
+        metavar='str',
+        type=str,
+        default='')
+
+    parser.add_argument(
+        '-k',
+        '--keys',
+        help='Choice of sharp (#) or flat (b) to write note and chord labels with',
+        metavar='str',
+        type=str,
+        default='b')
+
+    parser.add_argument(
+        '-w', '--weights', help='A boolean flag for using chord weights to less randomly select chords', action='store_true')
+
+    parser.add_argument(
+        '-n', '--notes_gen_chord', help='A boolean flag for whether to print the notes of chords created with '
+                                        'create_chord_chart', action='store_true')
+    parser.add_argument(
+        '-ins',
+        '--instrument',
+        help="Type of instrument to print fingerboard of options: 'guitar', 'guitar7', 'bass', 'bass5', 'ukulele', "
+             "'violin', 'mandolin'",
+        metavar='str',
+        type=str,
+        default='')
+
+    parser.add_argument(
+        '-t',
+        '--tuning',
+        help="Open string notes of the instrument from the lowest string up, e.g. 'D A D G B E' for drop D guitar",
+        metavar='str',
+        type=str,
+        default=None)
+
+    parser.add_argument(
+        '--frets',
+        help='Number of frets of the fingerboard, 1-24 (default: that of the instrument)',
+        metavar='int',
+        type=int,
+        default=None)
+
+    parser.add_argument(
+        '-m',
+        '--main',
+        help='main function to 1) generate a chord chart from notes -m "create_chord_chart", 2) Get note from a chord '
+             '-m "get_chord_notes", 3) Suggest scales to play over chords "suggest_scales", 4) Print a chord to an '
+             'instrument fingerboard "print_chord_fingerboard", 5) Print a scale to an '
+             'instrument fingerboard "print_scale_fingerboard", 6) Name every chord containing notes '
+             '"identify_chords", 7) List the diatonic 7th chords of a mode, e.g. D Dorian "get_mode_chords", '
+             '8) Suggest scales over the runs of chords of a progression "suggest_progression_scales", with -c the '
+             'whole chart is one progression, 9) List playable voicings of a chord on an instrument fingerboard '
+             '"find_chord_voicings", 10) Voice a progression on an instrument fingerboard with the least movement '
+             '"optimize_voice_leading", with -c the whole chart is one progression',
+        metavar='str',
+        type=str,
+        default='create_chord_chart')
+
+    parser.add_argument(
+        '-c', '--chart', help="A boolean flag to read chord input as chart text, chords separated by bar lines and "
+                              "spaces like 'Dm7 | G7 | C▵7'", action='store_true')
+
+    parser.add_argument(
+        '-s', '--stream', help='A boolean flag to read the input line by line (a file, or stdin with -i -) and write '
+                               'one JSON record per line, bad lines are written as error records',
+        action='store_true')
+
+    parser.add_argument(
+        '-f', '--format', help="Output format: 'text', 'json' or 'msgpack' (needs the msgpack package), "
+                               "with -s records are written as JSON lines unless msgpack",
+        metavar='str', type=str, choices=OUTPUT_FORMATS, default='text')
+
+    parser.add_argument(
+        '-j', '--jobs', help='Number of worker processes to split the input lines across', metavar='int', type=int,
+        default=1)
+
+    parser.add_argument(
+        '--seed', help='Master seed for create_chord_chart, each line gets a seed derived from it so the chart is '
+                       'the same for any number of jobs', metavar='int', type=int, default=None)
+
+    parser.add_argument(
+        '--profile', help='Record the time of each phase of the run and counters of the work done, printed to '
+                          'stderr, or written as JSON to the file given after the flag', metavar='str', type=str,
+        nargs='?', const='-', default=None)
+
+    parser.add_argument(
+        '-b', '--build', help='A boolean flag to rebuild the resource bundle and the cached suggest_scales table in '
+                             'resources/ and exit',
+        action='store_true')
+
+    return parser.parse_args()
+
+
+# --------------------------------------------------
+def warn(msg):
+    """Print a message to STDERR"""
+    print(msg, file=sys.stderr)
+
+
+# --------------------------------------------------
+def die(msg='Something bad happened'):
+    """warn() and exit with error"""
+    warn(msg)
+    sys.exit(1)
+
+
+# --------------------------------------------------
+def eprint(*args, **kwargs):
+    print(*args, file=sys.stderr, **kwargs)
+
+
+# --------------------------------------------------
+class TuneToolsError(ValueError):
+    """Invalid input to one of the main functions, main() reports it with die()"""
+
+
+# --------------------------------------------------
+class Profile:
+    """
+    Wall time and number of calls of each phase of a run, and counters of the work done, see PROFILE_COUNTERS
+    Phases nest and the time of a phase leaves out the phases run inside it, so the phase times add up
+    A Profile records while it is the active profile of the thread, set with profiling()
+    """
+
+    def __init__(self):
+        self.phases = {}
+        self.counters = collections.Counter()
+        self.wall = 0.0
+        # [phase, start time, time of the phases inside it] of each running phase
+        self.stack = []
+
+    def start(self, phase):
+        self.stack.append([phase, time.perf_counter(), 0.0])
+
+    def stop(self):
+        phase, start, inner = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        timing = self.phases.setdefault(phase, [0.0, 0])
+        timing[0] += elapsed - inner
+        timing[1] += 1
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def count(self, counter, n=1):
+        self.counters[counter] += n
+
+    def merge(self, other, wall=True):
+        """
+        Add the phases and counters of another Profile, and its wall time unless it ran alongside this one,
+        e.g. in a worker process
+        """
+        for phase, (seconds, calls) in other.phases.items():
+            timing = self.phases.setdefault(phase, [0.0, 0])
+            timing[0] += seconds
+            timing[1] += calls
+        self.counters.update(other.counters)
+        if wall:
+            self.wall += other.wall
+
+    def report(self):
+        """The phases, slowest first, and counters as a dict of JSON values"""
+        phases = sorted(self.phases.items(), key=lambda p: -p[1][0])
+        return {'wall_ms': round(self.wall * 1000, 3),
+                'phases': {phase: {'ms': round(seconds * 1000, 3), 'calls': calls} for phase, (seconds, calls) in phases},
+                'counters': dict(sorted(self.counters.items()))}
+
+
+# --------------------------------------------------
+# What each Profile counter counts, target_tier_n is which of target_note_tiers create_chord_chart matched
+PROFILE_COUNTERS = {
+    'lines': 'input lines run',
+    'error_lines': 'input lines that failed',
+    'resource_tables_bundled': 'resource tables unpickled from the resource bundle',
+    'resource_tables_built': 'resource tables built from their tsv',
+    'chords_sampled': 'random chords drawn by create_chord_chart',
+    'target_tier_1': 'lines matched with all of their notes',
+    'target_tier_2': 'lines matched without their last note',
+    'target_tier_3': 'lines matched without their last two notes',
+    'target_tier_4': 'lines matched with their first three notes',
+    'target_tier_5': 'lines matched with their first two notes',
+    'target_tier_6': 'lines matched with their first note',
+    'chord_memo_hits': 'repeated input lines answered from the chord memo',
+    'chord_memo_misses': 'input lines worked out and added to the chord memo',
+    'suggest_scales_table_hits': 'chords answered from the suggest_scales table',
+    'suggest_scales_searches': 'chords matched against every scale',
+    'scale_subset_tests': 'scale and root pairs tested by suggest_scales searches',
+    'identify_cache_hits': 'pitch class sets already identified',
+    'identify_cache_misses': 'pitch class sets identified',
+    'render_cache_hits': 'fingerboard strings already rendered',
+    'render_cache_misses': 'fingerboard strings rendered',
+    'voicing_cache_hits': 'chord voicings already found on a fingerboard',
+    'voicing_cache_misses': 'chord voicing searches run',
+    'voicing_suffixes': 'voicings of the higher strings worked out by voicing searches, not memoized',
+    'chord_result_hits': 'chord names on a root already looked up',
+    'chord_result_misses': 'chord names on a root looked up',
+}
+# The Profile recording in the current thread, None when not profiling
+active_profile = contextvars.ContextVar('active_profile', default=None)
+# (function, recording wrapper) of every function marked with profiled()
+profiled_functions = []
+# Number of profiling() blocks running in any thread, the recording wrappers are swapped in while above 0
+profiling_state = {'depth': 0}
+PROFILING_LOCK = threading.Lock()
+
+
+# --------------------------------------------------
+@contextlib.contextmanager
+def profiling(profile=None):
+    """
+    Record the main functions run in the with block in a Profile, a new one unless given, e.g.
+    with tune_tools.profiling() as profile:
+        tune_tools.run_main(...)
+    print(profile.report())
+    """
+    if profile is None:
+        profile = Profile()
+    with PROFILING_LOCK:
+        if profiling_state['depth'] == 0:
+            set_profiled_functions(recording=True)
+        profiling_state['depth'] += 1
+    token = active_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.wall += time.perf_counter() - start
+        active_profile.reset(token)
+        with PROFILING_LOCK:
+            profiling_state['depth'] -= 1
+            if profiling_state['depth'] == 0:
+                set_profiled_functions(recording=False)
+
+
+# --------------------------------------------------
+def profiled(phase):
+    """
+    Decorator marking a function or method as a phase of a Profile
+    The function is left as it is and only swapped for a wrapper recording its calls while profiling,
+    so the main functions run at full speed otherwise
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = active_profile.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            profile.start(phase)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.stop()
+        profiled_functions.append((func, wrapper))
+        return func
+    return decorator
+
+
+# --------------------------------------------------
+def set_profiled_functions(recording):
+    """Swap the functions marked with profiled() for their recording wrappers, or back"""
+    module_globals = globals()
+    for func, wrapper in profiled_functions:
+        new_func = wrapper if recording else func
+        class_name, _, name = func.__qualname__.rpartition('.')
+        if not class_name:
+            module_globals[name] = new_func
+            continue
+        attr = module_globals[class_name].__dict__[name]
+        if isinstance(attr, functools.cached_property):
+            attr.func = new_func
+        else:
+            setattr(module_globals[class_name], name, new_func)
+
+
+# --------------------------------------------------
+def count_event(counter, n=1):
+    """Add n to a counter of the active Profile, if there is one"""
+    profile = active_profile.get()
+    if profile is not None:
+        profile.counters[counter] += n
+
+
+# --------------------------------------------------
+def format_profile(report):
+    """Format a Profile report as the table --profile prints"""
+    line_list = [f"{'phase':<24}{'ms':>12}{'calls':>10}"]
+    for phase, timing in report['phases'].items():
+        line_list.append(f"{phase:<24}{timing['ms']:>12.3f}{timing['calls']:>10}")
+    # phases of parallel workers add up to more than the wall time
+    outside_ms = report['wall_ms'] - sum(timing['ms'] for timing in report['phases'].values())
+    if outside_ms >= 0:
+        line_list.append(f"{'(outside phases)':<24}{outside_ms:>12.3f}")
+    line_list.append(f"{'total':<24}{report['wall_ms']:>12.3f}")
+    line_list.append('')
+    line_list.append(f"{'counter':<32}{'count':>10}")
+    for counter, n in report['counters'].items():
+        line_list.append(f'{counter:<32}{n:>10}')
+    return '\n'.join(line_list) + '\n'
+
+
+# --------------------------------------------------
+RESOURCES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources')
+
+
+# --------------------------------------------------
+def read_tsv(file_path):
+    """Open and save a tsv file as list of OrderedDict"""
+    rows = []
+    with open(file_path, mode='r', encoding='utf-8-sig') as csvfile:
+        reader = csv.DictReader(csvfile, delimiter='\t')
+        for row in reader:
+            rows.append(row)
+    return rows
+
+
+# --------------------------------------------------
+def resource_hash(dirname, file_name_list):
+    """sha256 of the content of resource files"""
+    import hashlib
+    h = hashlib.sha256()
+    for file_name in file_name_list:
+        with open(os.path.join(dirname, file_name), 'rb') as file:
+            h.update(file.read())
+    return h.hexdigest()
+
+
+# --------------------------------------------------
+def resource_stat(dirname, file_name_list):
+    """Size and modification time of resource files, a cheap check that they are unchanged"""
+    stat_list = []
+    for file_name in file_name_list:
+        stat = os.stat(os.path.join(dirname, file_name))
+        stat_list.append((file_name, stat.st_size, stat.st_mtime_ns))
+    return stat_list
+
+
+# --------------------------------------------------
+RESOURCE_FILES = ['chromatic_numbers.tsv', 'chords.tsv', 'scales.tsv', 'modes.tsv']
+RESOURCE_BUNDLE_FILE = 'resources.bundle'
+# Bump when the resource table classes change so bundles are rebuilt
+RESOURCE_BUNDLE_VERSION = 10
+
+
+# --------------------------------------------------
+class FretboardLayout(collections.namedtuple('FretboardLayout', ['instrument', 'tuning', 'frets', 'inlay_dots'])):
+    """
+    How an instrument is drawn: the note names of its open strings from the lowest string up, which is drawn at
+    the bottom of the diagram, its number of frets and the frets with inlay dots, drawn in a line under the
+    strings unless there are none
+    """
+    __slots__ = ()
+
+
+# Frets with inlay dots, two dots at the octaves
+GUITAR_INLAY_DOTS = (3, 5, 7, 9, 12, 15, 17, 19, 21, 24)
+MANDOLIN_INLAY_DOTS = (3, 5, 7, 10, 12, 15, 17, 19, 22, 24)
+DOUBLE_DOT_FRETS = (12, 24)
+FRETBOARD_LAYOUTS = {
+    'guitar': FretboardLayout(instrument='guitar', tuning=('E', 'A', 'D', 'G', 'B', 'E'), frets=15,
+                              inlay_dots=GUITAR_INLAY_DOTS),
+    'guitar7': FretboardLayout(instrument='guitar7', tuning=('B', 'E', 'A', 'D', 'G', 'B', 'E'), frets=15,
+                               inlay_dots=GUITAR_INLAY_DOTS),
+    'bass': FretboardLayout(instrument='bass', tuning=('E', 'A', 'D', 'G'), frets=15, inlay_dots=GUITAR_INLAY_DOTS),
+    'bass5': FretboardLayout(instrument='bass5', tuning=('B', 'E', 'A', 'D', 'G'), frets=15,
+                             inlay_dots=GUITAR_INLAY_DOTS),
+    'ukulele': FretboardLayout(instrument='ukulele', tuning=('G', 'C', 'E', 'A'), frets=15,
+                               inlay_dots=MANDOLIN_INLAY_DOTS),
+    'violin': FretboardLayout(instrument='violin', tuning=('G', 'D', 'A', 'E'), frets=15, inlay_dots=()),
+    'mandolin': FretboardLayout(instrument='mandolin', tuning=('G', 'D', 'A', 'E'), frets=15,
+                                inlay_dots=MANDOLIN_INLAY_DOTS),
+}
+MAX_FRETS = 24
+MAX_STRINGS = 12
+TUNING_SEPARATOR_RE = re.compile(r'[\s,]+')
+
+
+# --------------------------------------------------
+def get_fretboard_layout(instrument, tuning=None, frets=None):
+    """
+    The FretboardLayout of an instrument name, with another tuning (a string of open string note names from the
+    lowest string up, e.g. 'D A D G B E') or number of frets when given
+    """
+    layout = FRETBOARD_LAYOUTS.get(instrument)
+    if layout is None:
+        raise TuneToolsError(f"Invalid instrument flag should be one of: {', '.join(map(repr, FRETBOARD_LAYOUTS))}")
+    if tuning:
+        tuning_list = tuple(n for n in TUNING_SEPARATOR_RE.split(tuning) if n)
+        if not 0 < len(tuning_list) <= MAX_STRINGS:
+            raise TuneToolsError(f'Invalid tuning {tuning!r} should be 1-{MAX_STRINGS} open string note names from '
+                                 f'the lowest string up, e.g. D A D G B E')
+        layout = layout._replace(tuning=tuning_list)
+    if frets is not None:
+        if not isinstance(frets, int) or not 0 < frets <= MAX_FRETS:
+            raise TuneToolsError(f'Invalid number of frets {frets} should be 1-{MAX_FRETS}')
+        layout = layout._replace(frets=frets)
+    return layout
+
+
+# --------------------------------------------------
+class Resources:
+    """
+    The resource tables used by the main functions, parsed once and shared between calls
+    e.g. a flask worker keeps one Resources for its lifetime
+    Each table is loaded on first use, so a main function only pays for the tables it needs,
+    from the precompiled resource bundle if one was built with tune-tools.py -b and is up to date
+    """
+
+    def __init__(self, dirname=RESOURCES_DIR, use_bundle=True):
+        self.dirname = dirname
+        self.use_bundle = use_bundle
+        self._suggest_scales_table = None
+        self._fingerboards = {}
+
+    @functools.cached_property
+    def bundle(self):
+        """The pickled tables of the resource bundle, empty if there is none or it is out of date"""
+        if not self.use_bundle:
+            return {}
+        return read_resource_bundle(self.dirname)
+
+    @profiled('load_resources')
+    def load_table(self, name, build):
+        """Unpickle a table from the resource bundle or build it from its tsv"""
+        if name in self.bundle:
+            import pickle
+            try:
+                table = pickle.loads(self.bundle[name])
+                count_event('resource_tables_bundled')
+                return table
+            except Exception as e:
+                warn(f'Could not load {name} from the resource bundle: {e}')
+        count_event('resource_tables_built')
+        return build()
+
+    @functools.cached_property
+    def chro_num_list(self):
+        # List of chromatic notes C to B with their numbered from 1-12
+        return self.load_table('chro_num_list', lambda: ChromaticNumbers(
+            read_tsv(os.path.join(self.dirname, 'chromatic_numbers.tsv'))))
+
+    @functools.cached_property
+    def chords_list(self):
+        return self.load_table('chords_list', lambda: Chords(
+            read_tsv(os.path.join(self.dirname, 'chords.tsv')), self.chro_num_list))
+
+    @functools.cached_property
+    def scales_list(self):
+        return self.load_table('scales_list', lambda: Scales(read_tsv(os.path.join(self.dirname, 'scales.tsv'))))
+
+    @functools.cached_property
+    def modes_list(self):
+        return self.load_table('modes_list', lambda: Modes(read_tsv(os.path.join(self.dirname, 'modes.tsv')),
+                                                           self.chro_num_list, self.chords_list))
+
+    def fingerboard_list(self, instrument, tuning=None, frets=None):
+        """
+        Get the Fingerboard of an instrument name, with another tuning (a string of open string note names from
+        the lowest string up) or number of frets when given, see get_fretboard_layout
+        """
+        key = (instrument, tuning, frets)
+        fingerboard = self._fingerboards.get(key)
+        if fingerboard is None:
+            layout = get_fretboard_layout(instrument=instrument, tuning=tuning, frets=frets)
+            chrom_tuning = tuple(get_chrom_number(chro_num_list=self.chro_num_list, note_str=n)
+                                 for n in layout.tuning)
+            fingerboard = make_fingerboard(tuning=chrom_tuning, frets=layout.frets)
+            if len(self._fingerboards) >= FINGERBOARD_CACHE_SIZE:
+                # tunings sent to a long running app are not kept forever
+                self._fingerboards.clear()
+            self._fingerboards[key] = fingerboard
+        return fingerboard
+
+    def suggest_scales_table(self, load=True):
+        """
+        Get the precomputed suggest_scales answers, loaded from or written to its cache file on first use
+        With load=False only a table that is already loaded is returned, otherwise None
+        """
+        if self._suggest_scales_table is None and load:
+            self._suggest_scales_table = load_suggest_scales_table(dirname=self.dirname,
+                                                                   chro_num_list=self.chro_num_list,
+                                                                   chords_list=self.chords_list,
+                                                                   scales_list=self.scales_list)
+        return self._suggest_scales_table
+
+
+# --------------------------------------------------
+@profiled('load_resources')
+def read_resource_bundle(dirname):
+    """
+    Load the resource bundle, returns {} if it is missing or was built from other resources
+    The tsv files are only hashed when their size or modification time changed since the bundle was built
+    """
+    import pickle
+    try:
+        with open(os.path.join(dirname, RESOURCE_BUNDLE_FILE), 'rb') as file:
+            data = pickle.load(file)
+        if data.get('version') != RESOURCE_BUNDLE_VERSION:
+            return {}
+        if data.get('resource_stat') != resource_stat(dirname, RESOURCE_FILES) and \
+                data.get('resource_hash') != resource_hash(dirname, RESOURCE_FILES):
+            return {}
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    return data['tables']
+
+
+# --------------------------------------------------
+def write_resource_bundle(dirname=RESOURCES_DIR):
+    """
+    Build every resource table with its indexes from the tsv files and save them in the resource bundle,
+    each table is pickled on its own so loading one does not unpickle the others
+    """
+    import pickle
+    resources = Resources(dirname=dirname, use_bundle=False)
+    tables = {'chro_num_list': resources.chro_num_list, 'chords_list': resources.chords_list,
+              'scales_list': resources.scales_list, 'modes_list': resources.modes_list}
+    data = {'version': RESOURCE_BUNDLE_VERSION, 'resource_hash': resource_hash(dirname, RESOURCE_FILES),
+            'resource_stat': resource_stat(dirname, RESOURCE_FILES),
+            'tables': {name: pickle.dumps(table, protocol=pickle.HIGHEST_PROTOCOL) for name, table in tables.items()}}
+    file_path = os.path.join(dirname, RESOURCE_BUNDLE_FILE)
+    # Written to a temporary file and renamed so concurrent readers never see a partial file
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as file:
+        pickle.dump(data, file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, file_path)
+    return resources
+
+
+# --------------------------------------------------
+def restore_indexed_rows(cls, rows, state):
+    """Unpickle an IndexedRows without rebuilding its indexes"""
+    self = tuple.__new__(cls, rows)
+    self.__dict__.update(state)
+    return self
+
+
+# --------------------------------------------------
+class IndexedRows(tuple):
+    """Base for the resource tables: a tuple of the tsv rows with lookup indexes as attributes"""
+
+    def __reduce__(self):
+        return restore_indexed_rows, (type(self), tuple(self), self.__dict__)
+
+
+# --------------------------------------------------
+class Note(collections.namedtuple('Note', ['chrom_number', 'flat', 'sharp', 'notation_list'])):
+    """A row of chromatic_numbers.tsv: a chromatic number, its flat and sharp note names and chord notation strings"""
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(chrom_number=int(row['chromatic_number']), flat=row['note_string_flat'],
+                   sharp=row['note_string_sharp'], notation_list=tuple(row['chord_number_string'].split("|")))
+
+
+# --------------------------------------------------
+class ChromaticNumbers(IndexedRows):
+    """
+    The Note rows of chromatic_numbers.tsv with lookup indexes built once when loaded:
+    note name -> chromatic number, chromatic number -> flat/sharp note name and
+    chord notation string (e.g. b3) -> chromatic number
+    """
+
+    def __new__(cls, rows):
+        self = super().__new__(cls, [Note.from_row(row) for row in rows])
+        self.number_by_note = {}
+        self.note_by_number = {'b': {}, '#': {}}
+        self.number_by_notation = {}
+        for c in self:
+            self.number_by_note[c.flat] = c.chrom_number
+            self.number_by_note[c.sharp] = c.chrom_number
+            self.note_by_number['b'][c.chrom_number] = c.flat
+            self.note_by_number['#'][c.chrom_number] = c.sharp
+            for notation_str in c.notation_list:
+                self.number_by_notation[notation_str] = c.chrom_number
+        return self
+
+
+# --------------------------------------------------
+def get_chrom_number(chro_num_list, note_str):
+    """Get the chromatic number associated with a note name string"""
+    try:
+        return chro_num_list.number_by_note[note_str]
+    except KeyError:
+        raise TuneToolsError(f'{note_str} is not an existing note string label')
+
+
+# --------------------------------------------------
+def get_chrom_note(chro_num_list, chrom_number, key_arg):
+    """Get the note name string associated with a chromatic number"""
+    note_by_number = chro_num_list.note_by_number['b' if key_arg == 'b' else '#']
+    try:
+        return note_by_number[chrom_number]
+    except KeyError:
+        raise TuneToolsError(f'{chrom_number} is not an existing chromatic note index')
+
+
+# --------------------------------------------------
+def get_chrom_from_chord_num(notation_str, chro_num_list):
+    """Get the chromatic number from the chord notation string"""
+    # input notation_str e.g. b3
+    # output chromatic number 4
+    try:
+        return chro_num_list.number_by_notation[notation_str]
+    except KeyError:
+        raise TuneToolsError(f'{notation_str} is not an existing chord notaton string')
+
+
+# --------------------------------------------------
+CHORD_NOTATION_COLUMNS = ['one', 'three', 'five', 'seven', 'nine', 'eleven', 'thirteen']
+# Chord degrees a voicing has to play: the root, the 3rd and the 7th
+VOICING_REQUIRED_COLUMNS = ['one', 'three', 'seven']
+
+
+# --------------------------------------------------
+def get_chord_chrom_list(chord_name, chords_list, chro_num_list):
+    """Get the chromatic numbers of the notes of a chord name in C"""
+    try:
+        return chords_list.chrom_list_by_name[chord_name]
+    except KeyError:
+        raise TuneToolsError(f'{chord_name} is not an existing chord name')
+
+
+# --------------------------------------------------
+def pitch_mask(chrom_note_list):
+    """12 bit integer of the pitch classes in a list of chromatic numbers, C is bit 0 and B is bit 11"""
+    mask = 0
+    for c in chrom_note_list:
+        mask |= 1 << (c - 1)
+    return mask
+
+
+# --------------------------------------------------
+def transpose_mask(mask, transp_int):
+    """Transpose a 12 bit pitch class mask by a transposition integer range(0-11) inclusive"""
+    return ((mask << transp_int) | (mask >> (12 - transp_int))) & 0xFFF
+
+
+# --------------------------------------------------
+class ChordType(collections.namedtuple('ChordType', ['name', 'chrom_list', 'mask', 'required_mask', 'weight',
+                                                     'comment', 'alt_label'])):
+    """
+    A row of chords.tsv: a chord name with the chromatic numbers of its notes in C, their pitch class mask, the mask
+    of its VOICING_REQUIRED_COLUMNS notes and weight
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, row, chro_num_list):
+        chrom_list = tuple(get_chrom_from_chord_num(notation_str=row[c], chro_num_list=chro_num_list)
+                           for c in CHORD_NOTATION_COLUMNS if row[c] != 'NA')
+        required_list = [get_chrom_from_chord_num(notation_str=row[c], chro_num_list=chro_num_list)
+                         for c in VOICING_REQUIRED_COLUMNS if row[c] != 'NA']
+        return cls(name=row['name'], chrom_list=chrom_list, mask=pitch_mask(chrom_list),
+                   required_mask=pitch_mask(required_list), weight=int(row['weight']), comment=row.get('comment'),
+                   alt_label=row.get('alt_label'))
+
+
+# --------------------------------------------------
+class Chords(IndexedRows):
+    """
+    The ChordType rows of chords.tsv with the chromatic numbers of each chord name, and the (chord name,
+    transposition int) candidates whose notes contain a pitch class mask, found for each mask on first use
+    A chord name listed twice resolves to its first row, as get_chord_chrom_list always did
+    """
+
+    def __new__(cls, rows, chro_num_list):
+        self = super().__new__(cls, [ChordType.from_row(row=row, chro_num_list=chro_num_list) for row in rows])
+        self.chrom_list_by_name = {}
+        # pitch class mask in C of the notes a voicing of each chord name has to play
+        self.required_mask_by_name = {}
+        # number of rows and summed weights of each chord name, the odds of generate_random_chord picking it
+        self.count_by_name = {}
+        self.weight_by_name = {}
+        for m in self:
+            if m.name not in self.chrom_list_by_name:
+                self.chrom_list_by_name[m.name] = list(m.chrom_list)
+                self.required_mask_by_name[m.name] = m.required_mask
+            self.count_by_name[m.name] = self.count_by_name.get(m.name, 0) + 1
+            self.weight_by_name[m.name] = self.weight_by_name.get(m.name, 0) + m.weight
+        return self
+
+    def __reduce__(self):
+        # the caches filled by use are not bundled
+        state = {k: v for k, v in self.__dict__.items()
+                 if k not in ('candidates_by_mask', 'samplers', 'identified', 'results')}
+        return restore_indexed_rows, (type(self), tuple(self), state)
+
+    def candidates(self, mask):
+        """
+        The samplers of the (chord name, transposition int) candidates whose notes contain a pitch class mask, by
+        row count (unweighted) and by summed weight (weighted), in chords.tsv order then by transposition
+        Found once per mask, a run only looks up the masks of its input; None when no chord contains the mask
+        """
+        candidates_by_mask = self.__dict__.setdefault('candidates_by_mask', {})
+        if mask in candidates_by_mask:
+            return candidates_by_mask[mask]
+        candidate_list = [(name, transp_int) for name, chrom_list in self.chrom_list_by_name.items()
+                          for transp_int in range(0, 12)
+                          if not mask & ~transpose_mask(pitch_mask(chrom_list), transp_int)]
+        samplers = None
+        if candidate_list:
+            samplers = (ChordSampler(item_list=candidate_list,
+                                     weight_list=[self.count_by_name[c[0]] for c in candidate_list]),
+                        ChordSampler(item_list=candidate_list,
+                                     weight_list=[self.weight_by_name[c[0]] for c in candidate_list]))
+        candidates_by_mask[mask] = samplers
+        return samplers
+
+    def sampler(self, weights_arg):
+        """
+        The ChordSampler of chord names with the odds of picking a random row of chords.tsv,
+        by the weight column when weights_arg is set, built once for each
+        """
+        key = bool(weights_arg)
+        samplers = self.__dict__.setdefault('samplers', {})
+        if key not in samplers:
+            samplers[key] = ChordSampler(item_list=[m.name for m in self],
+                                         weight_list=[m.weight if key else 1 for m in self])
+        return samplers[key]
+
+    def chord_result(self, chord_name, transp_int, key_arg, chro_num_list):
+        """The ChordResult of a chord name on the root of a transposition int, built once per key"""
+        results = self.__dict__.setdefault('results', {})
+        key = (chord_name, transp_int, key_arg)
+        res = results.get(key)
+        if res is not None:
+            count_event('chord_result_hits')
+            return res
+        count_event('chord_result_misses')
+        res = make_chord_result(chord_name=chord_name, transp_int=transp_int, chords_list=self,
+                                chro_num_list=chro_num_list, key_arg=key_arg)
+        results[key] = res
+        return res
+
+    @profiled('identify')
+    def identify(self, mask, key_arg, chro_num_list):
+        """
+        Every chord name and root whose notes contain a pitch class mask, as dicts of label, root, name, weight
+        and the number of extra notes, fewest extra notes then highest weight first
+        Built once per mask and key from candidates, the list is shared by every call so do not change it
+        """
+        identified = self.__dict__.setdefault('identified', {})
+        key = (mask, key_arg)
+        chord_list = identified.get(key)
+        if chord_list is not None:
+            count_event('identify_cache_hits')
+        else:
+            count_event('identify_cache_misses')
+            chord_list = []
+            candidates = self.candidates(mask)
+            note_count = bin(mask).count('1')
+            for chord_name, transp_int in (candidates[0].item_list if candidates else ()):
+                res = self.chord_result(chord_name=chord_name, transp_int=transp_int, key_arg=key_arg,
+                                        chro_num_list=chro_num_list)
+                chord_list.append({'label': res.label.strip(),
+                                   'root': get_chrom_note(chro_num_list=chro_num_list,
+                                                          chrom_number=res.chrom_note_list[0], key_arg=key_arg),
+                                   'name': chord_name, 'weight': self.weight_by_name[chord_name],
+                                   'extra_notes': bin(res.mask).count('1') - note_count})
+            # stable sort so ties stay in chords.tsv order and then by root
+            chord_list.sort(key=lambda c: (c['extra_notes'], -c['weight']))
+            identified[key] = chord_list
+        return chord_list
+
+
+# --------------------------------------------------
+# Rendered diagrams kept per fingerboard, enough for every pitch class set in either key
+FINGERBOARD_RENDER_CACHE_SIZE = 8192
+# Fingerboards kept for distinct (tuning, frets)
+FINGERBOARD_CACHE_SIZE = 64
+# Voicing searches kept per fingerboard
+VOICING_CACHE_SIZE = 1024
+
+
+# --------------------------------------------------
+class Fingerboard:
+    """
+    The fingerboard diagram of a tuning (chromatic numbers of the open strings, lowest string first) and number of
+    frets: the edge line, and the chromatic number of every fret of each string from the top of
+    the diagram (the highest string) down, open string first, computed once by make_fingerboard
+    Rendered strings are kept in an LRU cache keyed by (key_arg, pitch class mask), and voicings in one keyed by
+    the chord mask and the constraints of the search, along with the voice leading candidates picked from them
+    """
+    __slots__ = ('tuning', 'frets', 'edge_str', 'string_pitches', 'render_cache', 'voicing_cache')
+
+    def __init__(self, tuning, frets):
+        self.tuning = tuning
+        self.frets = frets
+        self.edge_str = '    ' + ' ----' * frets
+        self.string_pitches = tuple(tuple((open_number - 1 + fret) % 12 + 1 for fret in range(0, frets + 1))
+                                    for open_number in reversed(tuning))
+        self.render_cache = collections.OrderedDict()
+        self.voicing_cache = collections.OrderedDict()
+
+    def render_strings(self, key_arg, mask, chro_num_list):
+        """
+        The diagram line and the note name of every fret (None when not in the pitch class mask) of each string,
+        from the top of the diagram down, rendered once per pitch class set
+        """
+        key = (key_arg, mask)
+        strings = self.render_cache.get(key)
+        if strings is not None:
+            count_event('render_cache_hits')
+            try:
+                self.render_cache.move_to_end(key)
+            except KeyError:
+                # evicted by another thread in between
+                pass
+            return strings
+        count_event('render_cache_misses')
+        chrom_note_list = [n for n in range(1, 13) if mask >> (n - 1) & 1]
+        # note string of each chromatic number, blank for notes not in the chord or scale
+        note_strs = {n: format_fingerboard_note_str(chrom_number=n, chrom_note_list=chrom_note_list,
+                                                    chro_num_list=chro_num_list, key_arg=key_arg)
+                     for n in range(1, 13)}
+        note_names = {n: get_chrom_note(chro_num_list=chro_num_list, chrom_number=n, key_arg=key_arg)
+                      if n in chrom_note_list else None for n in range(1, 13)}
+        # the open string in brackets then each fret
+        strings = tuple(('(' + note_strs[pitch_list[0]] + ')¦' + ''.join(' ' + note_strs[n] + ' ¦'
+                                                                         for n in pitch_list[1:]),
+                         tuple(note_names[n] for n in pitch_list))
+                        for pitch_list in self.string_pitches)
+        self.render_cache[key] = strings
+        if len(self.render_cache) > FINGERBOARD_RENDER_CACHE_SIZE:
+            self.render_cache.popitem(last=False)
+        return strings
+
+    def voicings(self, mask, required_mask, root, bass=None, span=None):
+        """The voicings of a chord found by find_voicings, searched once per chord mask and constraints"""
+        span = VOICING_SPAN if span is None else span
+        key = (mask, required_mask, root, bass, span)
+        voicing_list = self.voicing_cache.get(key)
+        if voicing_list is not None:
+            count_event('voicing_cache_hits')
+            try:
+                self.voicing_cache.move_to_end(key)
+            except KeyError:
+                # evicted by another thread in between
+                pass
+            return voicing_list
+        count_event('voicing_cache_misses')
+        # the strings from the lowest up
+        voicing_list = find_voicings(pitch_lists=self.string_pitches[::-1], mask=mask, required_mask=required_mask,
+                                     root=root, bass=bass, span=span)
+        self.voicing_cache[key] = voicing_list
+        if len(self.voicing_cache) > VOICING_CACHE_SIZE:
+            self.voicing_cache.popitem(last=False)
+        return voicing_list
+
+    def leading_candidates(self, mask, required_mask, root, bass=None, span=None):
+        """
+        The voicings of a chord the voice leading is chosen from, the best VOICE_LEADING_CANDIDATES of
+        find_voicing_shapes, searched once per chord mask and constraints
+        """
+        span = VOICING_SPAN if span is None else span
+        key = ('candidates', mask, required_mask, root, bass, span)
+        candidate_list = self.voicing_cache.get(key)
+        if candidate_list is not None:
+            return candidate_list
+        # the strings from the lowest up
+        candidate_list = find_voicing_shapes(pitch_lists=self.string_pitches[::-1], mask=mask,
+                                             required_mask=required_mask, root=root, bass=bass,
+                                             span=span)[:VOICE_LEADING_CANDIDATES]
+        self.voicing_cache[key] = candidate_list
+        if len(self.voicing_cache) > VOICING_CACHE_SIZE:
+            self.voicing_cache.popitem(last=False)
+        return candidate_list
+
+
+# --------------------------------------------------
+# Most frets a hand covers, from the lowest fretted note of a voicing
+VOICING_SPAN = 4
+# Fewest notes of a voicing, fewer on an instrument with fewer strings
+VOICING_MIN_NOTES = 3
+# Fingers for the fretted notes, one of them may bar every note on the lowest fret
+VOICING_FINGERS = 4
+
+
+# --------------------------------------------------
+def get_voicing_window(pitch_lists, mask, w, span):
+    """
+    Helper for find_voicings and find_voicing_shapes: window 0 is the open strings alone, window w the frets w to
+    w + span - 1 with a note on fret w
+    Returns the frets of each string holding a note of the chord mask (open string first), the pitch classes
+    reachable from each string up and whether fret w is reachable from each string up
+    """
+    string_count = len(pitch_lists)
+    frets = len(pitch_lists[0]) - 1
+    fret_range = range(w, min(w + span, frets + 1)) if w else range(0)
+    choice_lists = [[f for f in itertools.chain((0,), fret_range) if mask >> (pitch_list[f] - 1) & 1]
+                    for pitch_list in pitch_lists]
+    reach = [0] * (string_count + 1)
+    for i in range(string_count - 1, -1, -1):
+        reach[i] = reach[i + 1]
+        for f in choice_lists[i]:
+            reach[i] |= 1 << (pitch_lists[i][f] - 1)
+    reach_w = [False] * (string_count + 1)
+    for i in range(string_count - 1, -1, -1):
+        reach_w[i] = reach_w[i + 1] or w in choice_lists[i]
+    return choice_lists, reach, reach_w
+
+
+# --------------------------------------------------
+@profiled('voicing')
+def find_voicings(pitch_lists, mask, required_mask, root, bass=None, span=VOICING_SPAN):
+    """
+    Every playable voicing of a chord on the strings of a fingerboard, pitch_lists the chromatic number of each fret
+    of each string from the lowest string up
+    A voicing plays at most one note of the chord mask on each string, open or within span frets of its lowest
+    fretted note, with every note of required_mask, and bass as its lowest note when given, and can be fingered:
+    one finger bars the lowest fret and each higher fretted note takes one of the other VOICING_FINGERS - 1
+    Returns tuples of the fret of each string (None when muted), ranked by the root (or bass) as the lowest note,
+    fewest muted strings, fewest open strings away from the open position, smallest stretch then lowest position
+    Searched by backtracking over the strings in each window of span frets, the voicings of the higher strings
+    memoized per (string, window, notes still needed) and cut off when the higher strings cannot reach the notes
+    """
+    string_count = len(pitch_lists)
+    frets = len(pitch_lists[0]) - 1
+    min_notes = min(VOICING_MIN_NOTES, string_count)
+    voicing_list = []
+    for w in range(0, frets + 1):
+        choice_lists, reach, reach_w = get_voicing_window(pitch_lists=pitch_lists, mask=mask, w=w, span=span)
+        memo = {}
+
+        def suffixes(i, missing, started, used_w, fingers):
+            """
+            Voicings of strings i up playing the missing notes with fingers left for the frets above w,
+            the first note the bass unless started
+            """
+            if i == string_count:
+                return ((),) if not missing and (used_w or not w) else ()
+            if missing & ~reach[i] or not (used_w or not w or reach_w[i]):
+                return ()
+            key = (i, missing, started, used_w, fingers)
+            result = memo.get(key)
+            if result is not None:
+                return result
+            count_event('voicing_suffixes')
+            result = [(None,) + v for v in suffixes(i + 1, missing, started, used_w, fingers)]
+            for f in choice_lists[i]:
+                if f > w and not fingers:
+                    continue
+                pitch = pitch_lists[i][f]
+                if not started and bass is not None and pitch != bass:
+                    continue
+                result.extend((f,) + v for v in suffixes(i + 1, missing & ~(1 << (pitch - 1)), True,
+                                                         used_w or f == w, fingers - (f > w)))
+            result = tuple(result)
+            memo[key] = result
+            return result
+
+        voicing_list.extend(v for v in suffixes(0, required_mask, False, False, VOICING_FINGERS - 1)
+                            if len(v) - v.count(None) >= min_notes)
+    lowest_note = root if bass is None else bass
+
+    def rank(voicing):
+        lowest = next(i for i, f in enumerate(voicing) if f is not None)
+        position = min((f for f in voicing if f), default=0)
+        return (pitch_lists[lowest][voicing[lowest]] != lowest_note, voicing.count(None),
+                voicing.count(0) if position > span else 0, max((f for f in voicing if f), default=0) - position,
+                position)
+    return tuple(sorted(voicing_list, key=rank))
+
+
+# --------------------------------------------------
+@profiled('voicing')
+def find_voicing_shapes(pitch_lists, mask, required_mask, root, bass=None, span=VOICING_SPAN):
+    """
+    The best ranked voicing of find_voicings for each lowest string played and position of the hand, ranked the
+    same way, found without listing every voicing: the position of a voicing is its window of frets, and the voicing
+    of the higher strings with the fewest muted strings, then open strings, then the lowest highest fret is the best
+    one whatever the lower strings play, so only that one is memoized per (string, window, notes still needed)
+    """
+    string_count = len(pitch_lists)
+    frets = len(pitch_lists[0]) - 1
+    min_notes = min(VOICING_MIN_NOTES, string_count)
+    lowest_note = root if bass is None else bass
+    # (rank, voicing) of each lowest string and window
+    shape_list = []
+    for w in range(0, frets + 1):
+        choice_lists, reach, reach_w = get_voicing_window(pitch_lists=pitch_lists, mask=mask, w=w, span=span)
+        # open strings only count against voicings away from the open position
+        open_cost = 1 if w > span else 0
+        memo = {}
+
+        def best_suffix(i, missing, used_w, fingers):
+            """
+            (muted strings, open strings, highest fret, frets) of the best voicing of strings i up playing the missing
+            notes with fingers left for the frets above w, None when there is none
+            """
+            if i == string_count:
+                return (0, 0, 0, ()) if not missing and (used_w or not w) else None
+            if missing & ~reach[i] or not (used_w or not w or reach_w[i]):
+                return None
+            key = (i, missing, used_w, fingers)
+            if key in memo:
+                return memo[key]
+            count_event('voicing_suffixes')
+            best = best_suffix(i + 1, missing, used_w, fingers)
+            if best is not None:
+                best = (best[0] + 1, best[1], best[2], (None,) + best[3])
+            for f in choice_lists[i]:
+                if f > w and not fingers:
+                    continue
+                suffix = best_suffix(i + 1, missing & ~(1 << (pitch_lists[i][f] - 1)), used_w or f == w,
+                                     fingers - (f > w))
+                if suffix is None:
+                    continue
+                candidate = (suffix[0], suffix[1] + (open_cost if f == 0 else 0), max(suffix[2], f),
+                             (f,) + suffix[3])
+                if best is None or candidate[:3] < best[:3]:
+                    best = candidate
+            memo[key] = best
+            return best
+
+        for lowest in range(0, string_count):
+            best = None
+            for f in choice_lists[lowest]:
+                pitch = pitch_lists[lowest][f]
+                if bass is not None and pitch != bass:
+                    continue
+                suffix = best_suffix(lowest + 1, required_mask & ~(1 << (pitch - 1)), f == w,
+                                     VOICING_FINGERS - 1 - (f > w))
+                if suffix is None or string_count - lowest - suffix[0] < min_notes:
+                    continue
+                rank = (pitch != lowest_note, lowest + suffix[0], suffix[1] + (open_cost if f == 0 else 0),
+                        max(suffix[2], f) - w if w else 0, w)
+                if best is None or rank < best[0]:
+                    best = (rank, (None,) * lowest + (f,) + suffix[3])
+            if best is not None:
+                shape_list.append(best)
+    return tuple(v for rank, v in sorted(shape_list, key=lambda s: s[0]))
+
+
+# --------------------------------------------------
+@functools.lru_cache(maxsize=FINGERBOARD_CACHE_SIZE)
+def make_fingerboard(tuning, frets):
+    """The Fingerboard of a tuning tuple and number of frets, built once and shared by every instrument using it"""
+    return Fingerboard(tuning=tuning, frets=frets)
+
+
+# --------------------------------------------------
+@functools.lru_cache(maxsize=None)
+def get_inlay_dots_str(inlay_dots, frets):
+    """The line of inlay dots drawn under the strings, for a tuple of the frets with dots"""
+    return '    ' + ''.join('     ' if fret not in inlay_dots else ' •  •' if fret in DOUBLE_DOT_FRETS else '  •  '
+                            for fret in range(1, frets + 1))
+
+
+# --------------------------------------------------
+class ChordSampler:
+    """
+    Items with their cumulative weights computed once, each sample is one bisect
+    Draws the same item as random.choices(item_list, weight_list) for the same random state
+    """
+    __slots__ = ('item_list', 'cum_weights', 'total')
+
+    def __init__(self, item_list, weight_list):
+        self.item_list = tuple(item_list)
+        self.cum_weights = tuple(itertools.accumulate(weight_list))
+        self.total = self.cum_weights[-1]
+
+    def __getstate__(self):
+        return self.item_list, self.cum_weights, self.total
+
+    def __setstate__(self, state):
+        self.item_list, self.cum_weights, self.total = state
+
+    def sample(self, rng=random):
+        """Pick an item, rng is the random module or a random.Random"""
+        return self.item_list[bisect.bisect_right(self.cum_weights, rng.random() * self.total,
+                                                  0, len(self.cum_weights) - 1)]
+
+
+# --------------------------------------------------
+class Scale(collections.namedtuple('Scale', ['name', 'chrom_list', 'mask'])):
+    """A row of scales.tsv: a scale name with the chromatic numbers of its notes on C and their pitch class mask"""
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, row):
+        chrom_list = tuple(map(int, row['chromatic_numbers'].split("|")))
+        return cls(name=row['name'], chrom_list=chrom_list, mask=pitch_mask(chrom_list))
+
+
+# --------------------------------------------------
+class Scales(IndexedRows):
+    """
+    The Scale rows of scales.tsv with the pitch class mask of every scale on each of the 12 roots, built once when
+    loaded
+    root_masks is a list of (scale name, [(root chromatic number, scale mask) for transposition ints 0-11])
+    """
+
+    def __new__(cls, rows):
+        self = super().__new__(cls, [Scale.from_row(row) for row in rows])
+        self.root_masks = []
+        # chromatic numbers of each scale name, a name listed twice resolves to its last row
+        self.chrom_list_by_name = {}
+        for s in self:
+            self.chrom_list_by_name[s.name] = list(s.chrom_list)
+            self.root_masks.append((s.name, [(transpose(chrom_number=s.chrom_list[0], transp_int=x),
+                                              transpose_mask(s.mask, x)) for x in range(0, 12)]))
+        return self
+
+    @functools.cached_property
+    def name_regex(self):
+        """A root followed by any scale name, the names tried in the order of scales.tsv"""
+        return re.compile(rf"{ROOT_PATTERN}\s({'|'.join(s.name for s in self)})")
+
+    @functools.cached_property
+    def candidates(self):
+        """(scale name, root chromatic number, scale mask) of every scale on each root, bit i of a containing set"""
+        return tuple((scale_name, root_number, scale_mask) for scale_name, root_mask_list in self.root_masks
+                     for root_number, scale_mask in root_mask_list)
+
+    def containing(self, mask):
+        """
+        The set of candidates whose notes contain a pitch class mask, as an int with bit i set for candidate i,
+        so the scales containing several chords are the & of their sets; built once per mask
+        """
+        containing_sets = self.__dict__.setdefault('containing_sets', {})
+        bits = containing_sets.get(mask)
+        if bits is None:
+            bits = 0
+            for i, (scale_name, root_number, scale_mask) in enumerate(self.candidates):
+                if not mask & ~scale_mask:
+                    bits |= 1 << i
+            containing_sets[mask] = bits
+        return bits
+
+
+# --------------------------------------------------
+# Names of the modes of modes.tsv by their scale and degree, a row not listed here is named by its name column
+MODE_NAMES = {
+    'Major': ['Ionian', 'Dorian', 'Phrygian', 'Lydian', 'Mixolydian', 'Aeolian', 'Locrian'],
+    'Harmonic-Minor': ['Harmonic minor', 'Locrian #6', 'Ionian #5', 'Dorian #4', 'Phrygian dominant', 'Lydian #2',
+                       'Altered bb7'],
+    'Melodic-Minor': ['Melodic minor', 'Dorian b2', 'Lydian augmented', 'Lydian b7', 'Mixolydian b6', 'Locrian #2',
+                      'Altered'],
+}
+
+
+# --------------------------------------------------
+class Mode(collections.namedtuple('Mode', ['name', 'row_name', 'chrom_list', 'mask', 'chord_label', 'comment'])):
+    """
+    A row of modes.tsv: a mode (e.g. 2-Major, named Dorian) with the chromatic numbers of its notes on C,
+    their pitch class mask and the label of its chord
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_row(cls, row, chro_num_list):
+        chrom_list = tuple(sorted(get_chrom_from_chord_num(notation_str=row[c], chro_num_list=chro_num_list)
+                                  for c in CHORD_NOTATION_COLUMNS if row[c] != 'NA'))
+        degree, _, scale = row['name'].partition('-')
+        names = MODE_NAMES.get(scale)
+        name = names[int(degree) - 1] if names and degree.isdigit() and 0 < int(degree) <= len(names) else row['name']
+        return cls(name=name, row_name=row['name'], chrom_list=chrom_list, mask=pitch_mask(chrom_list),
+                   chord_label=row['label'], comment=row.get('comment'))
+
+
+# --------------------------------------------------
+class Modes(IndexedRows):
+    """
+    The Mode rows of modes.tsv with the indexes built once when loaded:
+    mode name (lower case, or its name column) -> Mode,
+    chord pitch class mask on C -> the modes on C containing it, for every chord of chords.tsv and then any other
+    mask the first time it is looked up,
+    mode name -> the diatonic 7th chords of its degrees as (semitones above the mode root, chord name of chords.tsv)
+    """
+
+    def __new__(cls, rows, chro_num_list, chords_list):
+        self = super().__new__(cls, [Mode.from_row(row=row, chro_num_list=chro_num_list) for row in rows])
+        self.mode_by_name = {}
+        for m in self:
+            self.mode_by_name.setdefault(m.name.lower(), m)
+            self.mode_by_name.setdefault(m.row_name.lower(), m)
+        self.modes_by_mask = {}
+        for chrom_list in chords_list.chrom_list_by_name.values():
+            self.containing(pitch_mask(chrom_list))
+        # chord names by their pitch class mask on C, the first row of chords.tsv with 4 notes wins
+        seventh_chord_by_mask = {}
+        for c in chords_list:
+            if len(c.chrom_list) == 4:
+                seventh_chord_by_mask.setdefault(c.mask, c.name)
+        self.seventh_chords_by_name = {}
+        for m in self:
+            chord_list = []
+            for i, root in enumerate(m.chrom_list):
+                # stack the thirds of the mode from each degree and move the chord to C
+                transp_int = (13 - root) % 12
+                chord_mask = transpose_mask(pitch_mask(m.chrom_list[(i + j) % len(m.chrom_list)] for j in (0, 2, 4, 6)),
+                                            transp_int)
+                chord_name = seventh_chord_by_mask.get(chord_mask)
+                if chord_name is not None:
+                    chord_list.append((root - 1, chord_name))
+            self.seventh_chords_by_name[m.name] = tuple(chord_list)
+        return self
+
+    def containing(self, mask):
+        """The modes on C whose notes contain a pitch class mask on C, in the order of modes.tsv"""
+        modes = self.modes_by_mask.get(mask)
+        if modes is None:
+            modes = tuple(m for m in self if not mask & ~m.mask)
+            self.modes_by_mask[mask] = modes
+        return modes
+
+
+# --------------------------------------------------
+TRANSPOSITION_INTS = range(0, 12)
+# Transposed chromatic number of each chromatic number 1-12 for each transposition int
+TRANSPOSE_TABLE = [{n: n + x - 12 if n + x > 12 else n + x for n in range(1, 13)} for x in TRANSPOSITION_INTS]
+
+
+# --------------------------------------------------
+def transpose(chrom_number, transp_int):
+    chrom_number = int(chrom_number)
+    """Transpose a chromatic number"""
+    # input a chromatic number and a transposition integer range(0-11) inclusive
+    if transp_int not in TRANSPOSITION_INTS:
+        raise TuneToolsError('Invalid transposition integer range')
+    result = chrom_number + transp_int
+    if result > 12:
+        result -= 12
+    return result
+
+
+# --------------------------------------------------
+def transpose_list(chrom_note_list, transp_int):
+    """Transpose a list of chromatic numbers, one table lookup per note for the numbers 1-12"""
+    if transp_int not in TRANSPOSITION_INTS:
+        raise TuneToolsError('Invalid transposition integer range')
+    table = TRANSPOSE_TABLE[int(transp_int)]
+    try:
+        return [table[t] for t in chrom_note_list]
+    except (KeyError, TypeError):
+        return [transpose(chrom_number=t, transp_int=transp_int) for t in chrom_note_list]
+
+
+# --------------------------------------------------
+def get_chord_label_notes(chord_name, transp_int, chords_list, chro_num_list, key_arg):
+    """
+    Takes a chord name and transposition integer and returns a dict with a
+    note list and the chord label
+    """
+    chrom_list = get_chord_chrom_list(chord_name=chord_name, chords_list=chords_list, chro_num_list=chro_num_list)
+    transposed_list = transpose_list(chrom_note_list=chrom_list, transp_int=transp_int)
+    note_list = [get_chrom_note(chro_num_list=chro_num_list, chrom_number=t, key_arg=key_arg) for t in transposed_list]
+    label = f'{note_list[0]}' + chord_name
+    d = {'label': label, 'note_list': note_list}
+    return d
+
+
+# --------------------------------------------------
+# Chord names of a root/bass slash chord, the bass is the root and the root the bass plus the interval
+SLASH_ROOT_RE = re.compile(r"/root[+](\d)")
+
+
+# --------------------------------------------------
+class ChordResult(collections.namedtuple('ChordResult', ['label', 'chrom_note_list', 'mask'])):
+    """
+    Notes with a label: a chord on a root, or a scale on a root for the fingerboards
+    chrom_note_list is a tuple of the chromatic numbers, mask their pitch class mask
+    Immutable, so one is shared by every lookup of the same chord
+    """
+    __slots__ = ()
+
+    def as_dict(self):
+        """The label and chromatic note list, as the result dicts of the main functions have them"""
+        return {'label': self.label, 'chrom_note_list': list(self.chrom_note_list)}
+
+
+# --------------------------------------------------
+def get_chord_label_chrom_notes(chord_name, transp_int, chords_list, chro_num_list, key_arg):
+    """
+    Takes a chord name and transposition integer and returns a dict with a
+    chromatic note list and the chord label
+    """
+    return chords_list.chord_result(chord_name=chord_name, transp_int=transp_int, key_arg=key_arg,
+                                    chro_num_list=chro_num_list).as_dict()
+
+
+# --------------------------------------------------
+@profiled('chord_lookup')
+def make_chord_result(chord_name, transp_int, chords_list, chro_num_list, key_arg):
+    """
+    Takes a chord name and transposition integer and returns the ChordResult with the chord label,
+    use Chords.chord_result to get the one built for the chord
+    """
+    chrom_list = get_chord_chrom_list(chord_name=chord_name, chords_list=chords_list, chro_num_list=chro_num_list)
+    transposed_list = transpose_list(chrom_note_list=chrom_list, transp_int=transp_int)
+    chord_key = get_chrom_note(chro_num_list=chro_num_list, chrom_number=transposed_list[0], key_arg=key_arg)
+    match = SLASH_ROOT_RE.search(chord_name)
+    if match:
+        increment = match.group(1)
+        new_num = transpose(chrom_number=transposed_list[0], transp_int=int(increment))
+        new_note_lab = get_chrom_note(chro_num_list=chro_num_list, chrom_number=new_num, key_arg=key_arg)
+        label = f'{new_note_lab}/{chord_key}'
+    else:
+        label = f'{chord_key}' + chord_name
+    return ChordResult(label=label, chrom_note_list=tuple(transposed_list), mask=pitch_mask(transposed_list))
+
+
+# --------------------------------------------------
+def generate_random_chord(chords_list, chro_num_list, key_arg, weights_arg, rng=random):
+    """
+    Takes the chords_list (list of chords) and uses it to randomly choose a chord and a key based on a randomly
+    generated transposition int
+    rng is the random module or a random.Random to pick with
+    returns a chord label and chromatic note list
+    """
+    # Pick a random chord, by its weight when weights_arg is set
+    chord_name = chords_list.sampler(weights_arg).sample(rng)
+    count_event('chords_sampled')
+    # Generate random number for transposition int
+    transp_int = rng.randint(0, 11)
+    result = get_chord_label_chrom_notes(chord_name=chord_name, transp_int=transp_int, chords_list=chords_list,
+                                         chro_num_list=chro_num_list, key_arg=key_arg)
+    return result
+
+
+# --------------------------------------------------
+def is_ascending(chrom_note_list):
+    """Test if a list of chromatic numbers is strictly ascending"""
+    return all(a < b for a, b in zip(chrom_note_list, chrom_note_list[1:]))
+
+
+# --------------------------------------------------
+def target_note_tiers(target_list):
+    """The progressively relaxed lists of target notes a chord is searched for, all of the notes first"""
+    return [target_list, target_list[:-1], target_list[:-2], target_list[0:3], target_list[0:2], target_list[0:1]]
+
+
+# --------------------------------------------------
+@profiled('chord_search')
+def get_chord_for_target_notes(target_list, chords_list, chro_num_list, key_arg, weights_arg, rng=random):
+    """
+    Input list of chomatic note integers
+    Randomly picks one of the chords containing the notes of the first tier that any chord contains,
+    with the same odds as drawing random chords with generate_random_chord until one contains them
+    rng is the random module or a random.Random to pick with
+    """
+    for tier, tier_list in enumerate(target_note_tiers(target_list), start=1):
+        candidates = chords_list.candidates(pitch_mask(tier_list))
+        if candidates:
+            count_sampler, weight_sampler = candidates
+            chord_name, transp_int = (weight_sampler if weights_arg else count_sampler).sample(rng)
+            count_event('chords_sampled')
+            count_event(f'target_tier_{tier}')
+            return get_chord_label_chrom_notes(chord_name=chord_name, transp_int=transp_int,
+                                               chords_list=chords_list, chro_num_list=chro_num_list,
+                                               key_arg=key_arg)
+    raise TuneToolsError(f'No chord contains the notes {target_list}')
+
+
+# --------------------------------------------------
+def create_chord_chart(input_list, chro_num_list, chords_list, key_arg, weights_arg, rng=random):
+    """
+    Main function 1: generate a chart of chords from each line of the input note list file
+    rng is the random module or a random.Random to pick the chords with
+    """
+    chord_list = []
+    for i in input_list:
+        target_list = i.split(" ")
+        target_list = [get_chrom_number(chro_num_list=chro_num_list, note_str=t) for t in target_list]
+
+        chord = get_chord_for_target_notes(target_list=target_list, chords_list=chords_list,
+                                           chro_num_list=chro_num_list,
+                                           key_arg=key_arg, weights_arg=weights_arg, rng=rng)
+        chord_list.append(chord)
+    return chord_list
+
+
+# --------------------------------------------------
+def identify_chords(input_list, chro_num_list, chords_list, key_arg, chord_memo=None):
+    """
+    Main function 6: name the chords containing the notes of each line of the input note list file
+    Returns the input with the list of every chord name and root containing its notes, exact matches first,
+    then by the fewest extra notes and highest weight
+    chord_memo is a dict kept for a run so a repeated line of notes is only parsed once
+    """
+    if chord_memo is None:
+        chord_memo = {}
+    number_by_note = chro_num_list.number_by_note
+    result_list = []
+    for i in input_list:
+        memo_key = ('identify_chords', key_arg, i)
+        res = chord_memo.get(memo_key)
+        if res is not None:
+            count_event('chord_memo_hits')
+            result_list.append(dict(res))
+            continue
+        count_event('chord_memo_misses')
+        mask = 0
+        for t in i.split(" "):
+            chrom_number = number_by_note.get(t)
+            if chrom_number is None:
+                chrom_number = get_chrom_number(chro_num_list=chro_num_list, note_str=t)
+            mask |= 1 << (chrom_number - 1)
+        res = {'input': i, 'chord_list': chords_list.identify(mask=mask, key_arg=key_arg,
+                                                              chro_num_list=chro_num_list)}
+        memoize_chord(chord_memo=chord_memo, memo_key=memo_key, res=res)
+        result_list.append(res)
+    return result_list
+
+
+# --------------------------------------------------
+def format_identified_chords(result_list):
+    """Helper for Main function 6: format each input with its chord labels, the extra notes of each in brackets"""
+    line_list = []
+    for r in result_list:
+        if r['chord_list']:
+            chords_str = ', '.join(c['label'] if c['extra_notes'] == 0 else f"{c['label']} (+{c['extra_notes']})"
+                                   for c in r['chord_list'])
+        else:
+            chords_str = 'no chord contains these notes'
+        line_list.append(f"{r['input']}: {chords_str}\n")
+    return ''.join(line_list)
+
+
+# --------------------------------------------------
+def format_chord_chart(chord_list):
+    """Helper for Main function 1: format the chord chart as a single line of bars"""
+    print_list = [''] + [c['label'] for c in chord_list] + ['']
+    print_string = ' | '.join(print_list)
+    return print_string[1:] + '\n'
+
+
+# --------------------------------------------------
+# Note names in the order the parsers try them, so C# is read before C
+ROOT_PATTERN = '(C#|Cb|C|Db|D#|D|Eb|E|F#|F|Gb|G#|G|Ab|A#|A|Bb|B)'
+# One pass over a chord symbol: groups 1, 2 are the first root/bass slash chord anywhere in it,
+# otherwise groups 3, 4 are the first root and the chord name after it
+CHORD_SYMBOL_RE = re.compile(rf'(?=.*?{ROOT_PATTERN}/{ROOT_PATTERN})|.*?{ROOT_PATTERN}(.*)')
+# Chord symbols of a line of chart text, separated by bar lines and spaces
+CHART_TOKEN_RE = re.compile(r'[^\s|]+')
+
+
+# --------------------------------------------------
+@profiled('parse')
+def parse_printed_chord(input_chord, chro_num_list):
+    """
+    Helper function for Main function 2 and 3: Parse an input chord from written version with note and symbol
+    Return chord_name, chrom_note and bass_note
+    """
+    match = CHORD_SYMBOL_RE.match(input_chord)
+    if match is None:
+        raise TuneToolsError(f'{input_chord} is not a valid input chord')
+    note_str, bass_note, root_str, chord_name = match.groups()
+    if bass_note is not None:
+        chord_name = ''
+    else:
+        note_str = root_str
+        bass_note = ''
+    if chord_name == '':
+        chord_name = ' '
+    chrom_note = get_chrom_number(chro_num_list=chro_num_list, note_str=note_str)
+    d = {'chord_name': chord_name, 'chrom_note': int(chrom_note), 'bass_note': bass_note}
+    return d
+
+
+# --------------------------------------------------
+def split_chart_lines(lines):
+    """Yield the chord symbols of lines of chart text like 'Dm7 | G7 | C▵7', one chord per bar or space"""
+    for line in lines:
+        yield from CHART_TOKEN_RE.findall(line)
+
+
+# --------------------------------------------------
+def parse_chord_chart(text, chro_num_list):
+    """
+    Parse every chord symbol in chart text at once, each distinct symbol is parsed once
+    Returns the list of parse_printed_chord dicts with the input chord symbol added
+    """
+    parsed_by_symbol = {}
+    result_list = []
+    for symbol in CHART_TOKEN_RE.findall(text):
+        chord = parsed_by_symbol.get(symbol)
+        if chord is None:
+            chord = parse_printed_chord(input_chord=symbol, chro_num_list=chro_num_list)
+            chord['input'] = symbol
+            parsed_by_symbol[symbol] = chord
+        result_list.append(dict(chord))
+    return result_list
+
+
+# --------------------------------------------------
+def get_chord_notes(input_list, chro_num_list, chords_list, key_arg, chord_memo=None):
+    """
+    Main function 2: Gets a list of notes for each chord in the input file
+    chord_memo is a dict kept for a run so a repeated chord symbol is only parsed and resolved once
+    """
+    if chord_memo is None:
+        chord_memo = {}
+    result_list = []
+    for i in input_list:
+        memo_key = ('get_chord_notes', key_arg, i)
+        res = chord_memo.get(memo_key)
+        if res is not None:
+            count_event('chord_memo_hits')
+            result_list.append(dict(res))
+            continue
+        count_event('chord_memo_misses')
+        chord = parse_printed_chord(input_chord=i, chro_num_list=chro_num_list)
+        try:
+            res = get_chord_label_notes(chord_name=chord['chord_name'], transp_int=(int(chord['chrom_note']) - 1),
+                                        chords_list=chords_list, chro_num_list=chro_num_list, key_arg=key_arg)
+        except TuneToolsError:
+            raise TuneToolsError(f'{i} is not a valid input chord')
+        if chord['bass_note'] != '':
+            res['note_list'] = [chord['bass_note']] + res['note_list']
+        res['input'] = i
+        memoize_chord(chord_memo=chord_memo, memo_key=memo_key, res=res)
+        result_list.append(res)
+    return result_list
+
+
+# --------------------------------------------------
+# Distinct chord symbols remembered in a run, repeats past this are computed again
+CHORD_MEMO_SIZE = 4096
+
+
+# --------------------------------------------------
+def memoize_chord(chord_memo, memo_key, res):
+    """Helper for Main function 2, 3, 4 and 6: remember the result of an input line, a copy is handed out for repeats"""
+    if len(chord_memo) < CHORD_MEMO_SIZE:
+        chord_memo[memo_key] = dict(res)
+
+
+# --------------------------------------------------
+def format_chord_notes(result_list):
+    """Helper for Main function 2: format each input chord with its list of notes"""
+    return ''.join(f"{r['input']}: {', '.join(r['note_list'])}\n" for r in result_list)
+
+
+# --------------------------------------------------
+def get_chord_chrom_notes(input_list, chro_num_list, chords_list, key_arg, scales_list, action, fingerboard_list,
+                          instrument, suggest_scales_table=None, chord_memo=None, modes_list=None):
+    """
+    Gets a list of chromatic notes for each chord in an input file use list in:
+    Main function 3 to suggest scales to play over the input chord
+    Main function 4 to print the input chord notes on an instrument fingerboard diagram
+    chord_memo is a dict kept for a run so a repeated chord symbol is only parsed and resolved once
+    Returns the list of suggest_scales or fingerboard results
+    """
+    if chord_memo is None:
+        chord_memo = {}
+    result_list = []
+    for i in input_list:
+        memo_key = (action, key_arg, instrument, i)
+        res = chord_memo.get(memo_key)
+        if res is not None:
+            count_event('chord_memo_hits')
+            result_list.append(dict(res))
+            continue
+        count_event('chord_memo_misses')
+        res = get_input_chord_result(input_chord=i, chro_num_list=chro_num_list, chords_list=chords_list,
+                                     key_arg=key_arg)
+        if action == 'suggest_scales':
+            res = suggest_scales(scales_list=scales_list, input_chord=res, chro_num_list=chro_num_list,
+                                 key_arg=key_arg, suggest_scales_table=suggest_scales_table, modes_list=modes_list)
+        else:
+            res = get_fingerboard(input_chord=res, chro_num_list=chro_num_list, key_arg=key_arg,
+                                  fingerboard_list=fingerboard_list, instrument=instrument)
+        memoize_chord(chord_memo=chord_memo, memo_key=memo_key, res=res)
+        result_list.append(res)
+    return result_list
+
+
+# --------------------------------------------------
+def get_input_chord_result(input_chord, chro_num_list, chords_list, key_arg, chord=None):
+    """
+    Helper for Main function 3, 4 and 8: the ChordResult of an input chord symbol, the bass note first for a
+    root/bass slash chord; chord is its parse_printed_chord dict when already parsed
+    """
+    if chord is None:
+        chord = parse_printed_chord(input_chord=input_chord, chro_num_list=chro_num_list)
+    try:
+        res = chords_list.chord_result(chord_name=chord['chord_name'], transp_int=(int(chord['chrom_note']) - 1),
+                                       key_arg=key_arg, chro_num_list=chro_num_list)
+    except TuneToolsError:
+        raise TuneToolsError(f'{input_chord} is not a valid input chord')
+    if chord['bass_note'] != '':
+        bass_chrom_num = get_chrom_number(chro_num_list=chro_num_list, note_str=chord['bass_note'])
+        res = ChordResult(label=res.label.strip() + '/' + chord['bass_note'],
+                          chrom_note_list=(bass_chrom_num,) + res.chrom_note_list,
+                          mask=res.mask | 1 << (bass_chrom_num - 1))
+    return res
+
+
+# --------------------------------------------------
+@profiled('scale_matching')
+def suggest_scales(scales_list, input_chord, chro_num_list, key_arg, suggest_scales_table=None, modes_list=None):
+    """
+    Helper for Main function 3: Suggest scales that work over an input chords, a ChordResult
+    Returns the chord label with the lists of scales containing all or all but one of the chord notes,
+    looked up in the suggest_scales_table when one is given and it has the chord,
+    and the list of modes on the chord root containing it when modes_list is given
+    """
+    target_list = input_chord.chrom_note_list
+    input_chord_label = input_chord.label
+    if suggest_scales_table is not None:
+        answer = suggest_scales_table.get((key_arg, target_list))
+        if answer is not None:
+            count_event('suggest_scales_table_hits')
+            d = {'label': input_chord_label.strip(), 'consonant_scale_list': list(answer[0]),
+                 'other_scale_list': list(answer[1])}
+            if modes_list is not None:
+                d['mode_list'] = get_chord_mode_list(input_chord=input_chord, modes_list=modes_list,
+                                                     chro_num_list=chro_num_list, key_arg=key_arg)
+            return d
+    count_event('suggest_scales_searches')
+    count_event('scale_subset_tests', len(scales_list.root_masks) * len(TRANSPOSITION_INTS))
+    # need to transpose target_list to C
+    dist_to_c = target_list[0] - 1
+    inv_dist = 12 - dist_to_c
+    if inv_dist >= 12:
+        inv_dist -= 12
+    transposed_target_list = transpose_list(chrom_note_list=target_list, transp_int=inv_dist)
+    # A list is a sublist of a sorted scale list only if it is ascending and its notes are in the scale,
+    # so each sublist test is an ascending check done once plus a subset test of the pitch class masks
+    target_mask = pitch_mask(transposed_target_list) if is_ascending(transposed_target_list) else None
+    # Do subset combinations of target_list for more possibilities
+    combo_mask_list = list({pitch_mask(c) for c in
+                            itertools.combinations(transposed_target_list, (len(transposed_target_list) - 1))
+                            if is_ascending(c)})
+    consonant_scale_list = []
+    other_scale_list = []
+    for scale_name, root_mask_list in scales_list.root_masks:
+        for root_number, scale_mask in root_mask_list:
+            not_in_scale = ~scale_mask
+            consonant = target_mask is not None and not target_mask & not_in_scale
+            # every combination of a consonant target is in the scale as well
+            other = consonant
+            if not other:
+                for m in combo_mask_list:
+                    if not m & not_in_scale:
+                        other = True
+                        break
+            if other:
+                c_number = root_number - inv_dist
+                if c_number <= 0:
+                    c_number += 12
+                scale_label = f"{get_chrom_note(chro_num_list=chro_num_list, chrom_number=c_number, key_arg=key_arg)} " \
+                              f"{scale_name}"
+                if consonant:
+                    consonant_scale_list.append(scale_label)
+                if other:
+                    other_scale_list.append(scale_label)
+    # Remove duplicative scales
+    consonant_scale_list = clean_suggested_scale_list(scale_list=consonant_scale_list, key_arg=key_arg)
+    other_scale_list = clean_suggested_scale_list(scale_list=other_scale_list, key_arg=key_arg)
+    # # Remove duplication between lists
+    consonant_scale_set = set(consonant_scale_list)
+    final_other_list = list(dict.fromkeys(i for i in other_scale_list if i not in consonant_scale_set))
+    d = {'label': input_chord_label.strip(), 'consonant_scale_list': consonant_scale_list,
+         'other_scale_list': final_other_list}
+    if modes_list is not None:
+        d['mode_list'] = get_chord_mode_list(input_chord=input_chord, modes_list=modes_list,
+                                             chro_num_list=chro_num_list, key_arg=key_arg)
+    return d
+
+
+# --------------------------------------------------
+def get_chord_mode_list(input_chord, modes_list, chro_num_list, key_arg):
+    """
+    Helper for Main function 3: the labels of the modes of modes.tsv on the chord root (the bass of a slash chord)
+    containing the notes of an input chord, a ChordResult, looked up by its pitch class mask moved to C
+    """
+    root = input_chord.chrom_note_list[0]
+    mask = transpose_mask(input_chord.mask, (13 - root) % 12)
+    root_str = get_chrom_note(chro_num_list=chro_num_list, chrom_number=root, key_arg=key_arg)
+    return [f'{root_str} {m.name}' for m in modes_list.containing(mask)]
+
+
+# --------------------------------------------------
+SUGGEST_SCALES_TABLE_FILE = 'suggest_scales_table.json'
+# Bump when the suggest_scales output changes so cached tables are rebuilt
+SUGGEST_SCALES_TABLE_VERSION = 1
+# Below this many chords running suggest_scales is quicker than loading the table
+SUGGEST_SCALES_TABLE_MIN_CHORDS = 100
+
+
+# --------------------------------------------------
+def get_suggest_scales_input_chords(chro_num_list, chords_list):
+    """
+    Helper for Main function 3: the chromatic note lists of every chord parse_printed_chord can read,
+    each chord name on each of the 12 roots and each root/bass slash chord
+    """
+    chrom_note_list_set = set()
+    for chord_name in chords_list.chrom_list_by_name:
+        for transp_int in range(0, 12):
+            chrom_list = get_chord_chrom_list(chord_name=chord_name, chords_list=chords_list,
+                                              chro_num_list=chro_num_list)
+            chrom_note_list_set.add(tuple(transpose_list(chrom_note_list=chrom_list, transp_int=transp_int)))
+    triad = get_chord_chrom_list(chord_name=' ', chords_list=chords_list, chro_num_list=chro_num_list)
+    for transp_int in range(0, 12):
+        for bass_chrom_num in range(1, 13):
+            chrom_note_list_set.add((bass_chrom_num,) + tuple(transpose_list(chrom_note_list=triad,
+                                                                             transp_int=transp_int)))
+    return sorted(chrom_note_list_set)
+
+
+# --------------------------------------------------
+def build_suggest_scales_table(chro_num_list, chords_list, scales_list):
+    """
+    Helper for Main function 3: Run suggest_scales for every input chord with both keys
+    Returns a dict of (key_arg, chromatic note tuple) to (consonant scale tuple, other scale tuple)
+    """
+    table = {}
+    for chrom_note_list in get_suggest_scales_input_chords(chro_num_list=chro_num_list, chords_list=chords_list):
+        input_chord = ChordResult(label='', chrom_note_list=chrom_note_list, mask=pitch_mask(chrom_note_list))
+        for key_arg in ['b', '#']:
+            res = suggest_scales(scales_list=scales_list, input_chord=input_chord, chro_num_list=chro_num_list,
+                                 key_arg=key_arg)
+            table[(key_arg, chrom_note_list)] = (tuple(res['consonant_scale_list']), tuple(res['other_scale_list']))
+    return table
+
+
+# --------------------------------------------------
+def write_suggest_scales_table(file_path, table, table_hash):
+    """Save the suggest_scales table as json, each scale string is stored once and referenced by index"""
+    import json
+    string_index = {}
+    row_list = []
+    for (key_arg, chrom_note_list), answer in table.items():
+        row = [key_arg, list(chrom_note_list)]
+        for scale_list in answer:
+            row.append([string_index.setdefault(x, len(string_index)) for x in scale_list])
+        row_list.append(row)
+    data = {'version': SUGGEST_SCALES_TABLE_VERSION, 'resource_hash': table_hash, 'strings': list(string_index),
+            'table': row_list}
+    # Written to a temporary file and renamed so concurrent readers never see a partial file
+    tmp_path = f'{file_path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as file:
+        json.dump(data, file, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, file_path)
+
+
+# --------------------------------------------------
+def read_suggest_scales_table(file_path, table_hash):
+    """Load a suggest_scales table json, returns None if it is missing or was built from other resources"""
+    import json
+    try:
+        with open(file_path, encoding='utf-8') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if data.get('version') != SUGGEST_SCALES_TABLE_VERSION or data.get('resource_hash') != table_hash:
+        return None
+    strings = data['strings']
+    table = {}
+    for key_arg, chrom_note_list, consonant, other in data['table']:
+        table[(key_arg, tuple(chrom_note_list))] = (tuple(strings[i] for i in consonant),
+                                                    tuple(strings[i] for i in other))
+    return table
+
+
+# --------------------------------------------------
+@profiled('load_resources')
+def load_suggest_scales_table(dirname, chro_num_list, chords_list, scales_list, rebuild=False):
+    """
+    Get the suggest_scales table from its cache file in the resources directory
+    The file is keyed by a hash of chords.tsv, scales.tsv and chromatic_numbers.tsv and rebuilt when they change
+    """
+    file_path = os.path.join(dirname, SUGGEST_SCALES_TABLE_FILE)
+    table_hash = resource_hash(dirname, ['chords.tsv', 'scales.tsv', 'chromatic_numbers.tsv'])
+    table = None if rebuild else read_suggest_scales_table(file_path=file_path, table_hash=table_hash)
+    if table is None:
+        table = build_suggest_scales_table(chro_num_list=chro_num_list, chords_list=chords_list,
+                                           scales_list=scales_list)
+        try:
+            write_suggest_scales_table(file_path=file_path, table=table, table_hash=table_hash)
+        except OSError as e:
+            warn(f'Could not save {file_path}: {e}')
+    return table
+
+
+# --------------------------------------------------
+def format_suggested_scales(result_list):
+    """Helper for Main function 3: format the scales suggested for each chord"""
+    print_list = []
+    for r in result_list:
+        consonant_scales_string = '\n'.join(r['consonant_scale_list'])
+        other_scales_string = '\n'.join(r['other_scale_list'])
+        print_list.append(f"{r['label']}:\nScale(s) with all chord notes\n{consonant_scales_string}\n\n"
+                          f"Other scale(s)\n{other_scales_string}\n\n")
+        if 'mode_list' in r:
+            modes_string = '\n'.join(r['mode_list'])
+            print_list.append(f"Mode(s) on the chord root\n{modes_string}\n\n")
+    return ''.join(print_list)
+
+
+# --------------------------------------------------
+# Symmetric scales suggested on every root of one collection of notes, listed once by clean_suggested_scale_list:
+# (scales in flat key, scales in sharp key, collection in flat key, collection in sharp key)
+SYMMETRIC_SCALE_GROUPS = [
+    (frozenset(['C whole half diminished', 'Eb whole half diminished', 'Gb whole half diminished',
+                'A whole half diminished']),
+     frozenset(['C whole half diminished', 'D# whole half diminished', 'F# whole half diminished',
+                'A whole half diminished']),
+     'whole half diminished C, Eb, Gb, A', 'whole half diminished C, D#, F#, A'),
+    (frozenset(['Db whole half diminished', 'E whole half diminished', 'G whole half diminished',
+                'Bb whole half diminished']),
+     frozenset(['C# whole half diminished', 'E whole half diminished', 'G whole half diminished',
+                'A# whole half diminished']),
+     'whole half diminished Db, E, G, Bb', 'whole half diminished C#, E, G, A#'),
+    (frozenset(['D whole half diminished', 'F whole half diminished', 'Ab whole half diminished',
+                'B whole half diminished']),
+     frozenset(['D whole half diminished', 'F whole half diminished', 'G# whole half diminished',
+                'B whole half diminished']),
+     'whole half diminished D, F, Ab, B', 'whole half diminished D, F, G#, B'),
+    (frozenset(['C whole tone scale', 'D whole tone scale', 'E whole tone scale', 'Gb whole tone scale',
+                'Ab whole tone scale', 'Bb whole tone scale']),
+     frozenset(['C whole tone scale', 'D whole tone scale', 'E whole tone scale', 'F# whole tone scale',
+                'G# whole tone scale', 'A# whole tone scale']),
+     'whole tone scale C, D, E, Gb, Ab, Bb', 'whole tone scale C, D, E, F#, G#, A#'),
+    (frozenset(['B whole tone scale', 'Db whole tone scale', 'Eb whole tone scale', 'F whole tone scale',
+                'G whole tone scale', 'A whole tone scale']),
+     frozenset(['B whole tone scale', 'C# whole tone scale', 'D# whole tone scale', 'F whole tone scale',
+                'G whole tone scale', 'A whole tone scale']),
+     'whole tone scale B, Db, Eb, F, G, A', 'whole tone scale B, C#, D#, F, G, A'),
+]
+
+
+# --------------------------------------------------
+def clean_suggested_scale_list(scale_list, key_arg):
+    """Helper function for Main function 3 to clean up the lists of suggested scales"""
+    for flat_set, sharp_set, flat_label, sharp_label in SYMMETRIC_SCALE_GROUPS:
+        if flat_set.issubset(scale_list) or sharp_set.issubset(scale_list):
+            if key_arg == 'b':
+                scale_list = [i for i in scale_list if i not in flat_set]
+                scale_list.append(flat_label)
+            else:
+                scale_list = [i for i in scale_list if i not in sharp_set]
+                scale_list.append(sharp_label)
+    return scale_list
+
+
+# --------------------------------------------------
+@profiled('render')
+def get_fingerboard(input_chord, chro_num_list, key_arg, fingerboard_list, instrument):
+    """
+    Helper for Main function 4 and 5: put the notes of an input chord or scale, a ChordResult, on an instrument
+    fingerboard
+    Returns the diagram label and list of diagram lines
+    """
+    layout = FRETBOARD_LAYOUTS.get(instrument)
+    if layout is None:
+        raise TuneToolsError(f'{instrument} is not a valid instrument')
+    edge_str = fingerboard_list.edge_str
+    # strings from the top of the diagram down
+    strings = fingerboard_list.render_strings(key_arg=key_arg, mask=input_chord.mask, chro_num_list=chro_num_list)
+    label = f"{input_chord.label.strip()} on {instrument}"
+    # diagram lines
+    line_list = [edge_str]
+    for line, note_names in strings:
+        line_list.extend([line, edge_str])
+    if layout.inlay_dots:
+        line_list.append(get_inlay_dots_str(inlay_dots=layout.inlay_dots, frets=fingerboard_list.frets))
+    # the chromatic number and note name (None when not played) of each fret, open string first
+    string_list = [{'pitch_list': pitch_list, 'note_list': note_names}
+                   for pitch_list, (line, note_names) in zip(fingerboard_list.string_pitches, strings)]
+    d = {'label': label, 'line_list': line_list, 'instrument': instrument,
+         'chrom_note_list': list(input_chord.chrom_note_list), 'string_list': string_list}
+    return d
+
+
+# --------------------------------------------------
+def format_fingerboards(result_list):
+    """Helper for Main function 4 and 5: format each fingerboard diagram with its label"""
+    return ''.join(f"{r['label']}\n" + '\n'.join(r['line_list']) + '\n\n' for r in result_list)
+
+
+# --------------------------------------------------
+def format_fingerboard_note_str(chrom_number, chrom_note_list, chro_num_list, key_arg):
+    """
+    Helper for function 4
+    returns a note string formatted to print to an instrument fingerboard diagram
+    """
+    note_str = get_chrom_note(chro_num_list=chro_num_list, chrom_number=chrom_number, key_arg=key_arg)
+    if chrom_number in chrom_note_list:
+        if len(note_str) == 1:
+            note_str += ' '
+    else:
+        note_str = '  '
+    return note_str
+
+
+# --------------------------------------------------
+@profiled('parse')
+def parse_printed_scale(input_scale, scales_list):
+    """
+    Helper for Main function 5: Parse an input scale from written version with note and scale name
+    Return note_str and scale_name
+    """
+    match = scales_list.name_regex.search(input_scale)
+    if match is None:
+        raise TuneToolsError(f'{input_scale} is not a valid scale name')
+    d = {'note_str': match.group(1), 'scale_name': match.group(2)}
+    return d
+
+
+# --------------------------------------------------
+def get_scale_fingerboard(input_list, scales_list, chro_num_list, key_arg, fingerboard_list, instrument):
+    """
+    Main function 5: puts the notes from an input scale on an instrument fingerboard diagram
+    Returns the list of fingerboard results
+    """
+    result_list = []
+    for i in input_list:
+        scale = parse_printed_scale(input_scale=i, scales_list=scales_list)
+        note_str = scale['note_str']
+        scale_str = scale['scale_name']
+        chrom_num = get_chrom_number(chro_num_list=chro_num_list, note_str=note_str)
+        scale_chrom_num_list = scales_list.chrom_list_by_name[scale_str]
+        # Need to transpose target_list to C to check against chromatic numbers of the scales list
+        dist_to_c = chrom_num - 1
+        inv_dist = 12 - dist_to_c
+        if inv_dist >= 12:
+            inv_dist -= 12
+        transposed_target_list = transpose_list(chrom_note_list=scale_chrom_num_list, transp_int=inv_dist)
+        # Transpose back to original key
+        c_number = chrom_num - inv_dist
+        if c_number <= 0:
+            c_number += 12
+        re_transposed_target_list = transpose_list(chrom_note_list=transposed_target_list, transp_int=(c_number - 1))
+        res = ChordResult(label=f'{note_str} {scale_str}', chrom_note_list=tuple(re_transposed_target_list),
+                          mask=pitch_mask(re_transposed_target_list))
+        result_list.append(get_fingerboard(input_chord=res, chro_num_list=chro_num_list, key_arg=key_arg,
+                                           fingerboard_list=fingerboard_list, instrument=instrument))
+    return result_list
+
+
+# --------------------------------------------------
+MODE_RE = re.compile(rf'{ROOT_PATTERN}\s+(.+)')
+
+
+# --------------------------------------------------
+@profiled('parse')
+def parse_printed_mode(input_mode, modes_list):
+    """
+    Helper for Main function 7: Parse an input mode from written version with note and mode name, e.g. D Dorian
+    Return note_str and the Mode
+    """
+    match = MODE_RE.fullmatch(input_mode.strip())
+    mode = modes_list.mode_by_name.get(match.group(2).strip().lower()) if match else None
+    if mode is None:
+        raise TuneToolsError(f'{input_mode} is not a valid mode name')
+    d = {'note_str': match.group(1), 'mode': mode}
+    return d
+
+
+# --------------------------------------------------
+def get_mode_chords(input_list, modes_list, chro_num_list, chords_list, key_arg):
+    """
+    Main function 7: the diatonic 7th chords of each degree of an input mode, e.g. D Dorian
+    Returns the mode label with its notes and chord labels, from the chords of the mode on C in the modes index
+    """
+    result_list = []
+    for i in input_list:
+        parsed = parse_printed_mode(input_mode=i, modes_list=modes_list)
+        mode = parsed['mode']
+        root = get_chrom_number(chro_num_list=chro_num_list, note_str=parsed['note_str'])
+        note_list = [get_chrom_note(chro_num_list=chro_num_list, chrom_number=t, key_arg=key_arg)
+                     for t in transpose_list(chrom_note_list=mode.chrom_list, transp_int=root - 1)]
+        chord_list = [chords_list.chord_result(chord_name=chord_name, transp_int=(root - 1 + interval) % 12,
+                                               key_arg=key_arg, chro_num_list=chro_num_list).label.strip()
+                      for interval, chord_name in modes_list.seventh_chords_by_name[mode.name]]
+        result_list.append({'label': f"{parsed['note_str']} {mode.name}", 'note_list': note_list,
+                            'chord_list': chord_list})
+    return result_list
+
+
+# --------------------------------------------------
+def format_mode_chords(result_list):
+    """Helper for Main function 7: format each mode with its notes and diatonic 7th chords"""
+    return ''.join(f"{r['label']}: {' '.join(r['note_list'])}\n{' | '.join(r['chord_list'])}\n\n"
+                   for r in result_list)
+
+
+# --------------------------------------------------
+@profiled('scale_matching')
+def common_scale_segments(set_list):
+    """
+    Helper for Main function 8: the maximal runs of consecutive items of a list of containing sets (ints, see
+    Scales.containing) whose & is not empty, as (first index, last index, & of the sets), in one pass
+    The window [left, right] is kept as two stacks so moving either end costs one &: the older part holds the &
+    of each suffix of its items, the newer part the running & of its items. An item with an empty set is a run of
+    its own with the empty set
+    """
+    segment_list = []
+    # & of the older items from each one to the last of them, the first item of the window on top
+    front = []
+    # first item and running & of the newer items
+    back_start = 0
+    back_set = -1
+    left = 0
+    for right, item_set in enumerate(set_list):
+        if not item_set:
+            if left < right:
+                segment_list.append((left, right - 1, (front[-1] if front else -1) & back_set))
+            segment_list.append((right, right, 0))
+            front = []
+            left = back_start = right + 1
+            back_set = -1
+            continue
+        if (front[-1] if front else -1) & back_set & item_set == 0:
+            # the window cannot grow past right - 1, so it is a maximal run
+            segment_list.append((left, right - 1, (front[-1] if front else -1) & back_set))
+            while (front[-1] if front else -1) & back_set & item_set == 0:
+                if not front:
+                    # move the newer items to the older part, with the & of each suffix
+                    suffix_set = -1
+                    for i in range(right - 1, back_start - 1, -1):
+                        suffix_set &= set_list[i]
+                        front.append(suffix_set)
+                    back_start = right
+                    back_set = -1
+                front.pop()
+                left += 1
+        back_set &= item_set
+    if left < len(set_list):
+        segment_list.append((left, len(set_list) - 1, (front[-1] if front else -1) & back_set))
+    return segment_list
+
+
+# --------------------------------------------------
+def suggest_progression_scales(input_list, chro_num_list, chords_list, scales_list, key_arg):
+    """
+    Main function 8: Suggest scales over a chord progression, each line of the input a chart like
+    'Dm7 | G7 | C▵7 | A7'
+    Returns the chords of each line with the maximal runs of consecutive chords that have scales containing every
+    note of each of their chords, numbered from 1, and those scales
+    """
+    result_list = []
+    for i in input_list:
+        chord_list = []
+        set_list = []
+        for chord in parse_chord_chart(text=i, chro_num_list=chro_num_list):
+            res = get_input_chord_result(input_chord=chord['input'], chro_num_list=chro_num_list,
+                                         chords_list=chords_list, key_arg=key_arg, chord=chord)
+            chord_list.append(res.label.strip())
+            set_list.append(scales_list.containing(res.mask))
+        segment_list = []
+        for first, last, common_set in common_scale_segments(set_list=set_list):
+            scale_list = [f"{get_chrom_note(chro_num_list=chro_num_list, chrom_number=root_number, key_arg=key_arg)} "
+                          f"{scale_name}"
+                          for n, (scale_name, root_number, scale_mask) in enumerate(scales_list.candidates)
+                          if common_set >> n & 1]
+            segment_list.append({'start': first + 1, 'end': last + 1, 'chord_list': chord_list[first:last + 1],
+                                 'scale_list': clean_suggested_scale_list(scale_list=scale_list, key_arg=key_arg)})
+        result_list.append({'input': i, 'chord_list': chord_list, 'segment_list': segment_list})
+    return result_list
+
+
+# --------------------------------------------------
+def format_progression_scales(result_list):
+    """Helper for Main function 8: format the runs of chords of each progression with their common scales"""
+    print_list = []
+    for r in result_list:
+        print_list.append(f"{' | '.join(r['chord_list'])}\n")
+        for segment in r['segment_list']:
+            scales_str = ', '.join(segment['scale_list']) if segment['scale_list'] else 'no scale contains these chords'
+            if segment['start'] == segment['end']:
+                bars_str = f"Chord {segment['start']}"
+            else:
+                bars_str = f"Chords {segment['start']}-{segment['end']}"
+            print_list.append(f"{bars_str} ({' | '.join(segment['chord_list'])}): {scales_str}\n")
+        print_list.append('\n')
+    return ''.join(print_list)
+
+
+# --------------------------------------------------
+# Voicings listed per chord, the best ranked first
+VOICING_LIST_SIZE = 10
+
+
+# --------------------------------------------------
+def find_chord_voicings(input_list, chro_num_list, chords_list, key_arg, fingerboard_list, instrument, span=None):
+    """
+    Main function 9: playable voicings of each input chord on an instrument fingerboard, see find_voicings
+    The root, 3rd and 7th of the chord have to be played, the other notes may be left out,
+    and the bass of a root/bass slash chord is the lowest note
+    Returns the chord label with the number of voicings found and the best VOICING_LIST_SIZE, each the fret and note
+    name of every string from the lowest up (None when muted)
+    """
+    result_list = []
+    for i in input_list:
+        res, voicing_list = get_chord_voicings(input_chord=i, chro_num_list=chro_num_list, chords_list=chords_list,
+                                               key_arg=key_arg, fingerboard_list=fingerboard_list, span=span)
+        result_list.append({'label': f"{res.label.strip()} on {instrument}", 'voicing_count': len(voicing_list),
+                            'voicing_list': [get_voicing_dict(voicing=v, fingerboard_list=fingerboard_list,
+                                                              chro_num_list=chro_num_list, key_arg=key_arg)
+                                             for v in voicing_list[:VOICING_LIST_SIZE]]})
+    return result_list
+
+
+# --------------------------------------------------
+def get_chord_voicings(input_chord, chro_num_list, chords_list, key_arg, fingerboard_list, span=None, chord=None,
+                       candidates=False):
+    """
+    Helper for Main function 9 and 10: the ChordResult of an input chord symbol and its ranked voicings on a
+    fingerboard, or only its voice leading candidates with candidates, chord is its parse_printed_chord dict when
+    already parsed
+    """
+    if chord is None:
+        chord = parse_printed_chord(input_chord=input_chord, chro_num_list=chro_num_list)
+    res = get_input_chord_result(input_chord=input_chord, chro_num_list=chro_num_list, chords_list=chords_list,
+                                 key_arg=key_arg, chord=chord)
+    root = chord['chrom_note']
+    bass = None
+    if chord['bass_note'] != '':
+        bass = get_chrom_number(chro_num_list=chro_num_list, note_str=chord['bass_note'])
+    # the root, 3rd and 7th of the chord from its chords.tsv columns
+    required_mask = transpose_mask(chords_list.required_mask_by_name[chord['chord_name']], root - 1)
+    if candidates:
+        return res, fingerboard_list.leading_candidates(mask=res.mask, required_mask=required_mask, root=root,
+                                                        bass=bass, span=span)
+    voicing_list = fingerboard_list.voicings(mask=res.mask, required_mask=required_mask, root=root, bass=bass,
+                                             span=span)
+    return res, voicing_list
+
+
+# --------------------------------------------------
+def get_voicing_dict(voicing, fingerboard_list, chro_num_list, key_arg):
+    """Helper for Main function 9 and 10: the fret and note name of each string of a voicing, None when muted"""
+    # the strings from the lowest up
+    pitch_lists = fingerboard_list.string_pitches[::-1]
+    return {'frets': list(voicing),
+            'note_list': [None if f is None else get_chrom_note(chro_num_list=chro_num_list,
+                                                                chrom_number=pitch_list[f], key_arg=key_arg)
+                          for f, pitch_list in zip(voicing, pitch_lists)]}
+
+
+# --------------------------------------------------
+def format_chord_voicings(result_list):
+    """Helper for Main function 9: format the frets of each voicing from the lowest string up, x when muted"""
+    print_list = []
+    for r in result_list:
+        print_list.append(f"{r['label']}: {r['voicing_count']} voicing(s)\n")
+        for v in r['voicing_list']:
+            frets_str = ' '.join(f"{'x' if f is None else f:>2}" for f in v['frets'])
+            print_list.append(f"{frets_str}   {' '.join(n for n in v['note_list'] if n is not None)}\n")
+        print_list.append('\n')
+    return ''.join(print_list)
+
+
+# --------------------------------------------------
+# Voicings of each chord the voice leading is chosen from, the best ranked of find_voicing_shapes: the best ranked
+# voicings alone are near copies of one shape
+VOICE_LEADING_CANDIDATES = 32
+# Movement of a string that starts or stops sounding, a string played by both voicings costs a fret per semitone
+VOICE_LEADING_STRING_COST = 2
+# Cost of each string a voicing leaves muted, so a progression is not led through three note fragments
+VOICE_LEADING_MUTE_COST = 1
+
+
+# --------------------------------------------------
+def movement_cost(voicing_a, voicing_b):
+    """
+    Helper for Main function 10: the finger and pitch movement from one voicing to the next, the frets moved on each
+    string played by both plus VOICE_LEADING_STRING_COST for each string played by only one
+    """
+    cost = 0
+    for fret_a, fret_b in zip(voicing_a, voicing_b):
+        if fret_a is None or fret_b is None:
+            if fret_a is not fret_b:
+                cost += VOICE_LEADING_STRING_COST
+        else:
+            cost += abs(fret_a - fret_b)
+    return cost
+
+
+# --------------------------------------------------
+def mute_cost(voicing):
+    """Helper for Main function 10: VOICE_LEADING_MUTE_COST for each string a voicing leaves muted"""
+    return voicing.count(None) * VOICE_LEADING_MUTE_COST
+
+
+# --------------------------------------------------
+@profiled('voice_leading')
+def lead_voices(candidate_lists, key_list, cost_cache=None):
+    """
+    Helper for Main function 10: choose one voicing from each list of candidates with the least total
+    movement_cost plus VOICE_LEADING_MUTE_COST for each muted string, by dynamic programming (Viterbi) over the
+    chords: the cheapest way to reach each candidate of a chord comes from the cheapest ways to reach the candidates
+    of the chord before, so n chords of k candidates take n * k * k costs instead of the k ** n paths
+    key_list has a key of the candidates of each chord, the costs between two of them are kept in cost_cache, so
+    chords with the same key must have the same candidates
+    Returns the index of the chosen candidate of each chord
+    """
+    if not candidate_lists:
+        return []
+    if cost_cache is None:
+        cost_cache = {}
+    # least total cost of a path to each candidate of the current chord
+    total_list = [mute_cost(voicing=v) for v in candidate_lists[0]]
+    # for each chord after the first, the candidate of the chord before on the cheapest path to each candidate
+    back_lists = []
+    for t in range(1, len(candidate_lists)):
+        cost_key = (key_list[t - 1], key_list[t])
+        matrix = cost_cache.get(cost_key)
+        if matrix is None:
+            # a row for each candidate, its muted strings and the movement from every candidate of the chord before
+            matrix = [[movement_cost(voicing_a=a, voicing_b=b) + mute_cost(voicing=b) for a in candidate_lists[t - 1]]
+                      for b in candidate_lists[t]]
+            cost_cache[cost_key] = matrix
+        next_total_list = []
+        back_list = []
+        for row in matrix:
+            best_i = 0
+            best_total = total_list[0] + row[0]
+            for i in range(1, len(row)):
+                total = total_list[i] + row[i]
+                if total < best_total:
+                    best_i = i
+                    best_total = total
+            next_total_list.append(best_total)
+            back_list.append(best_i)
+        total_list = next_total_list
+        back_lists.append(back_list)
+    # the cheapest last candidate, the best ranked on ties, and back along its path
+    j = min(range(len(total_list)), key=total_list.__getitem__)
+    path = [j]
+    for back_list in reversed(back_lists):
+        j = back_list[j]
+        path.append(j)
+    return path[::-1]
+
+
+# --------------------------------------------------
+def optimize_voice_leading(input_list, chro_num_list, chords_list, key_arg, fingerboard_list, instrument):
+    """
+    Main function 10: voice a chord progression on an instrument fingerboard with the least finger and pitch
+    movement, each line of the input a chart like 'Dm7 | G7 | C▵7', the voicing of each chord chosen from its
+    Fingerboard.leading_candidates by lead_voices
+    A chord with no voicing is left unvoiced and the voice leading starts again after it
+    Returns the chords of each line with their voicing, movement cost from the voicing before and mute_cost, the
+    total movement, the total mute cost, their sum that lead_voices minimizes and the time taken in ms
+    """
+    result_list = []
+    for i in input_list:
+        start = time.perf_counter()
+        step_list = []
+        # costs between the candidates of two chords, worked out once for each pair of chords following each other
+        cost_cache = {}
+        # (ChordResult, candidates) of each chord symbol on the fingerboard, worked out once for each distinct chord,
+        # keyed by the input symbol rather than the label as 'D/C' and 'C/root+2' share a label but not candidates
+        candidate_memo = {}
+        # (memo key, ChordResult, candidates) of the chords since the last one with no voicing
+        run = []
+        chord_list = parse_chord_chart(text=i, chro_num_list=chro_num_list)
+        for n, chord in enumerate(chord_list):
+            memo_key = (chord['input'], instrument, fingerboard_list.tuning, fingerboard_list.frets)
+            if memo_key not in candidate_memo:
+                candidate_memo[memo_key] = get_chord_voicings(
+                    input_chord=chord['input'], chro_num_list=chro_num_list, chords_list=chords_list, key_arg=key_arg,
+                    fingerboard_list=fingerboard_list, chord=chord, candidates=True)
+            res, candidate_list = candidate_memo[memo_key]
+            if candidate_list:
+                run.append((memo_key, res, candidate_list))
+                if n < len(chord_list) - 1:
+                    continue
+            path = lead_voices(candidate_lists=[c for k, r, c in run], key_list=[k for k, r, c in run],
+                               cost_cache=cost_cache)
+            previous = None
+            for (run_key, run_res, run_candidate_list), j in zip(run, path):
+                voicing = run_candidate_list[j]
+                step = get_voicing_dict(voicing=voicing, fingerboard_list=fingerboard_list,
+                                        chro_num_list=chro_num_list, key_arg=key_arg)
+                step['label'] = run_res.label.strip()
+                step['cost'] = 0 if previous is None else movement_cost(voicing_a=previous, voicing_b=voicing)
+                step['mute_cost'] = mute_cost(voicing=voicing)
+                step_list.append(step)
+                previous = voicing
+            run = []
+            if not candidate_list:
+                step_list.append({'label': res.label.strip(), 'frets': None, 'note_list': None, 'cost': 0,
+                                  'mute_cost': 0})
+        total_cost = sum(s['cost'] for s in step_list)
+        total_mute_cost = sum(s['mute_cost'] for s in step_list)
+        result_list.append({'input': i, 'label': f"{' | '.join(s['label'] for s in step_list)} on {instrument}",
+                            'step_list': step_list, 'total_cost': total_cost, 'total_mute_cost': total_mute_cost,
+                            'voice_leading_cost': total_cost + total_mute_cost,
+                            'ms': round((time.perf_counter() - start) * 1000, 3)})
+    return result_list
+
+
+# --------------------------------------------------
+def format_voice_leading(result_list):
+    """
+    Helper for Main function 10: format the voicing of each chord with its movement and mute costs, and the totals
+    with the voice leading cost minimized, their sum
+    """
+    print_list = []
+    for r in result_list:
+        print_list.append(f"{r['label']}\n")
+        for step in r['step_list']:
+            if step['frets'] is None:
+                print_list.append(f"{step['label']:<10}no voicing\n")
+                continue
+            frets_str = ' '.join(f"{'x' if f is None else f:>2}" for f in step['frets'])
+            print_list.append(f"{step['label']:<10}{frets_str}   move {step['cost']} + mute {step['mute_cost']}\n")
+        print_list.append(f"Total movement {r['total_cost']} + mute {r['total_mute_cost']} = voice leading cost "
+                          f"{r['voice_leading_cost']} in {r['ms']:.1f} ms\n\n")
+    return ''.join(print_list)
+
+
+# --------------------------------------------------
+MAIN_FUNCTIONS = ['create_chord_chart', 'get_chord_notes', 'suggest_scales', 'print_chord_fingerboard',
+                  'print_scale_fingerboard', 'identify_chords', 'get_mode_chords', 'suggest_progression_scales',
+                  'find_chord_voicings', 'optimize_voice_leading']
+# Main functions whose input lines are chord symbols
+CHORD_INPUT_FUNCTIONS = ['get_chord_notes', 'suggest_scales', 'print_chord_fingerboard', 'find_chord_voicings']
+# Main functions drawing on an instrument fingerboard
+FINGERBOARD_FUNCTIONS = ['print_chord_fingerboard', 'print_scale_fingerboard', 'find_chord_voicings',
+                         'optimize_voice_leading']
+# Main functions whose input lines are charts, with -c every line of the input is one chart
+PROGRESSION_INPUT_FUNCTIONS = ['suggest_progression_scales', 'optimize_voice_leading']
+
+
+# --------------------------------------------------
+def check_main_args(main_arg, key_arg, instrument_arg, resources, tuning_arg=None, frets_arg=None):
+    """Raise TuneToolsError for arguments that make every input line fail"""
+    if key_arg not in ['b', '#']:
+        raise TuneToolsError('Incorrect Keys argument should be # or b')
+    if main_arg not in MAIN_FUNCTIONS:
+        raise TuneToolsError(f'{main_arg} is not a valid feature select "create_chord_chart" or "get_chord_notes" '
+                             f'instead')
+    if main_arg in FINGERBOARD_FUNCTIONS:
+        resources.fingerboard_list(instrument_arg, tuning=tuning_arg, frets=frets_arg)
+
+
+# --------------------------------------------------
+def run_main(main_arg, input_list, resources, key_arg, weights_arg=False, notes_for_gen_chord_bool_arg=False,
+             instrument_arg='', seed=None, jobs=1, tuning_arg=None, frets_arg=None):
+    """
+    Run one of the main functions over the input list with already loaded resources
+    Returns the text output of the main function, raises TuneToolsError on invalid input
+    """
+    result_list = run_main_results(main_arg=main_arg, input_list=input_list, resources=resources, key_arg=key_arg,
+                                   weights_arg=weights_arg, notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg,
+                                   instrument_arg=instrument_arg, seed=seed, jobs=jobs, tuning_arg=tuning_arg,
+                                   frets_arg=frets_arg)
+    return format_main_results(main_arg=main_arg, result_list=result_list,
+                               notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg)
+
+
+# --------------------------------------------------
+def run_main_results(main_arg, input_list, resources, key_arg, weights_arg=False, notes_for_gen_chord_bool_arg=False,
+                     instrument_arg='', seed=None, jobs=1, tuning_arg=None, frets_arg=None):
+    """
+    Run one of the main functions over the input list with already loaded resources
+    Returns the list of result dicts, one per input line, raises TuneToolsError on invalid input
+    """
+    check_main_args(main_arg=main_arg, key_arg=key_arg, instrument_arg=instrument_arg, resources=resources,
+                    tuning_arg=tuning_arg, frets_arg=frets_arg)
+    kwargs = dict(main_arg=main_arg, key_arg=key_arg, weights_arg=weights_arg,
+                  notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg, instrument_arg=instrument_arg, seed=seed,
+                  tuning_arg=tuning_arg, frets_arg=frets_arg)
+    if jobs > 1:
+        records = parallel_stream_main(lines=input_list, resources=resources, jobs=jobs, **kwargs)
+    else:
+        records = stream_main(lines=input_list, resources=resources,
+                              load_suggest_scales_table=len(input_list) >= SUGGEST_SCALES_TABLE_MIN_CHORDS, **kwargs)
+    result_list = []
+    for record in records:
+        if 'error' in record:
+            raise TuneToolsError(record['error'])
+        result_list.append(record['result'])
+    return result_list
+
+
+# --------------------------------------------------
+@profiled('format')
+def format_main_results(main_arg, result_list, notes_for_gen_chord_bool_arg=False):
+    """Format the result dicts of a main function as the text tune-tools.py prints"""
+    if main_arg == 'create_chord_chart':
+        """Main function 1: print out chart of chords generated from each line of the input note list file"""
+        output = format_chord_chart(chord_list=result_list)
+        if notes_for_gen_chord_bool_arg:
+            output += '\n\nChord notes:\n' + format_chord_notes(
+                result_list=[{'input': r['label'], 'note_list': r['note_list']} for r in result_list])
+        return output
+    elif main_arg == 'get_chord_notes':
+        """Main function 2: Gets a list of notes for each chord in the input file"""
+        return format_chord_notes(result_list=result_list)
+    elif main_arg == 'suggest_scales':
+        """Main function 3: Suggest scales that work over an input list of chords"""
+        return format_suggested_scales(result_list=result_list)
+    elif main_arg == 'identify_chords':
+        """Main function 6: Name the chords containing each line of notes"""
+        return format_identified_chords(result_list=result_list)
+    elif main_arg == 'get_mode_chords':
+        """Main function 7: List the diatonic 7th chords of each mode"""
+        return format_mode_chords(result_list=result_list)
+    elif main_arg == 'suggest_progression_scales':
+        """Main function 8: Suggest scales over runs of chords of each progression"""
+        return format_progression_scales(result_list=result_list)
+    elif main_arg == 'find_chord_voicings':
+        """Main function 9: List playable voicings of each chord on an instrument fingerboard"""
+        return format_chord_voicings(result_list=result_list)
+    elif main_arg == 'optimize_voice_leading':
+        """Main function 10: Voice each progression with the least movement"""
+        return format_voice_leading(result_list=result_list)
+    else:
+        """Main function 4 and 5: prints the notes from an input chord or scale to an instrument fingerboard diagram"""
+        return format_fingerboards(result_list=result_list)
+
+
+# --------------------------------------------------
+OUTPUT_FORMATS = ['text', 'json', 'msgpack']
+
+
+# --------------------------------------------------
+def dump_results(obj, output_format):
+    """
+    Encode result dicts (or stream records) as json (one line) or msgpack bytes
+    msgpack is optional and only imported when asked for
+    """
+    if output_format == 'json':
+        import json
+        return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+    elif output_format == 'msgpack':
+        try:
+            import msgpack
+        except ImportError:
+            raise TuneToolsError('msgpack output needs the msgpack package: pip install msgpack')
+        return msgpack.packb(obj, use_bin_type=True)
+    raise TuneToolsError(f"Invalid output format {output_format} should be one of: 'json', 'msgpack'")
+
+
+# --------------------------------------------------
+def run_main_line(main_arg, line, resources, key_arg, weights_arg=False, notes_for_gen_chord_bool_arg=False,
+                  instrument_arg='', suggest_scales_table=None, rng=random, chord_memo=None, tuning_arg=None,
+                  frets_arg=None):
+    """
+    Run one of the main functions on a single input line
+    chord_memo is a dict shared by the lines of a run so repeated chords are computed once
+    tuning_arg and frets_arg change the tuning and number of frets of the instrument, see get_fretboard_layout
+    Returns the result dict of the line, raises TuneToolsError on invalid input
+    """
+    chro_num_list = resources.chro_num_list
+    chords_list = resources.chords_list
+    if main_arg == 'create_chord_chart':
+        res = create_chord_chart(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                 key_arg=key_arg, weights_arg=weights_arg, rng=rng)[0]
+        if notes_for_gen_chord_bool_arg:
+            res['note_list'] = get_chord_notes(input_list=[res['label']], chro_num_list=chro_num_list,
+                                               chords_list=chords_list, key_arg=key_arg,
+                                               chord_memo=chord_memo)[0]['note_list']
+        return res
+    elif main_arg == 'get_chord_notes':
+        return get_chord_notes(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                               key_arg=key_arg, chord_memo=chord_memo)[0]
+    elif main_arg == 'suggest_scales':
+        return get_chord_chrom_notes(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                     key_arg=key_arg, scales_list=resources.scales_list, action='suggest_scales',
+                                     fingerboard_list='', instrument='',
+                                     suggest_scales_table=suggest_scales_table, chord_memo=chord_memo,
+                                     modes_list=resources.modes_list)[0]
+    elif main_arg == 'identify_chords':
+        return identify_chords(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                               key_arg=key_arg, chord_memo=chord_memo)[0]
+    elif main_arg == 'get_mode_chords':
+        return get_mode_chords(input_list=[line], modes_list=resources.modes_list, chro_num_list=chro_num_list,
+                               chords_list=chords_list, key_arg=key_arg)[0]
+    elif main_arg == 'suggest_progression_scales':
+        return suggest_progression_scales(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                          scales_list=resources.scales_list, key_arg=key_arg)[0]
+    elif main_arg == 'find_chord_voicings':
+        return find_chord_voicings(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                   key_arg=key_arg, fingerboard_list=resources.fingerboard_list(
+                                       instrument_arg, tuning=tuning_arg, frets=frets_arg),
+                                   instrument=instrument_arg)[0]
+    elif main_arg == 'optimize_voice_leading':
+        return optimize_voice_leading(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                      key_arg=key_arg, fingerboard_list=resources.fingerboard_list(
+                                          instrument_arg, tuning=tuning_arg, frets=frets_arg),
+                                      instrument=instrument_arg)[0]
+    elif main_arg == 'print_chord_fingerboard':
+        return get_chord_chrom_notes(input_list=[line], chro_num_list=chro_num_list, chords_list=chords_list,
+                                     key_arg=key_arg, scales_list=resources.scales_list, action='print_chord',
+                                     fingerboard_list=resources.fingerboard_list(instrument_arg, tuning=tuning_arg,
+                                                                                 frets=frets_arg),
+                                     instrument=instrument_arg, chord_memo=chord_memo)[0]
+    else:
+        return get_scale_fingerboard(input_list=[line], scales_list=resources.scales_list,
+                                     chro_num_list=chro_num_list, key_arg=key_arg,
+                                     fingerboard_list=resources.fingerboard_list(instrument_arg, tuning=tuning_arg,
+                                                                                 frets=frets_arg),
+                                     instrument=instrument_arg)[0]
+
+
+# --------------------------------------------------
+def line_rng(seed, line_number):
+    """
+    The random.Random for one input line derived from the master seed, so a line gets the same chords
+    however the lines are split between processes; the global random module when there is no seed
+    """
+    if seed is None:
+        return random
+    return random.Random(f'{seed}:{line_number}')
+
+
+# --------------------------------------------------
+@profiled('run_line')
+def run_record(line_number, line, resources, main_arg, key_arg, weights_arg=False,
+               notes_for_gen_chord_bool_arg=False, instrument_arg='', seed=None, suggest_scales_table=None,
+               chord_memo=None, tuning_arg=None, frets_arg=None):
+    """Run one of the main functions on an input line, returns its record with the result or error message"""
+    count_event('lines')
+    try:
+        res = run_main_line(main_arg=main_arg, line=line, resources=resources, key_arg=key_arg,
+                            weights_arg=weights_arg, notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg,
+                            instrument_arg=instrument_arg, suggest_scales_table=suggest_scales_table,
+                            rng=line_rng(seed=seed, line_number=line_number), chord_memo=chord_memo,
+                            tuning_arg=tuning_arg, frets_arg=frets_arg)
+    except TuneToolsError as e:
+        count_event('error_lines')
+        return {'line': line_number, 'input': line, 'error': str(e)}
+    return {'line': line_number, 'input': line, 'result': res}
+
+
+# --------------------------------------------------
+def stream_main(main_arg, lines, resources, key_arg, weights_arg=False, notes_for_gen_chord_bool_arg=False,
+                instrument_arg='', seed=None, load_suggest_scales_table=True, first_line=1, tuning_arg=None,
+                frets_arg=None):
+    """
+    Run one of the main functions on each line of an iterable of input lines
+    Yields one record per line with its line number (counted from first_line), input and result or error message,
+    so an invalid line does not stop the run and the lines are never all held in memory
+    """
+    check_main_args(main_arg=main_arg, key_arg=key_arg, instrument_arg=instrument_arg, resources=resources,
+                    tuning_arg=tuning_arg, frets_arg=frets_arg)
+    suggest_scales_table = None
+    if main_arg == 'suggest_scales':
+        suggest_scales_table = resources.suggest_scales_table(load=load_suggest_scales_table)
+    chord_memo = {}
+    for line_number, line in enumerate(lines, start=first_line):
+        yield run_record(line_number=line_number, line=line, resources=resources, main_arg=main_arg,
+                         key_arg=key_arg, weights_arg=weights_arg,
+                         notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg, instrument_arg=instrument_arg,
+                         seed=seed, suggest_scales_table=suggest_scales_table, chord_memo=chord_memo,
+                         tuning_arg=tuning_arg, frets_arg=frets_arg)
+
+
+# --------------------------------------------------
+# Lines handed to the process pool at a time, times the number of jobs, so memory stays bounded
+PARALLEL_BATCH_LINES = 2000
+# Set once in each worker process by init_worker
+worker_state = {}
+
+
+# --------------------------------------------------
+def init_worker(dirname, kwargs, profile=False):
+    """
+    Process pool initializer: load the resources a worker needs once, not per task
+    With profile each task records a Profile of its line, the profiled functions are swapped in for the worker's life
+    """
+    if profile:
+        with PROFILING_LOCK:
+            profiling_state['depth'] += 1
+            set_profiled_functions(recording=True)
+    resources = Resources(dirname=dirname)
+    resources.chro_num_list
+    resources.chords_list
+    suggest_scales_table = None
+    if kwargs['main_arg'] == 'suggest_scales':
+        suggest_scales_table = resources.suggest_scales_table()
+    worker_state.update(resources=resources, kwargs=kwargs, suggest_scales_table=suggest_scales_table,
+                        chord_memo={}, profile=profile)
+
+
+# --------------------------------------------------
+def run_worker_line(item):
+    """Process pool task: the record of one (line number, line), and its Profile when profiling"""
+    line_number, line = item
+    if not worker_state['profile']:
+        return run_record(line_number=line_number, line=line, resources=worker_state['resources'],
+                          suggest_scales_table=worker_state['suggest_scales_table'],
+                          chord_memo=worker_state['chord_memo'], **worker_state['kwargs'])
+    with profiling() as profile:
+        record = run_record(line_number=line_number, line=line, resources=worker_state['resources'],
+                            suggest_scales_table=worker_state['suggest_scales_table'],
+                            chord_memo=worker_state['chord_memo'], **worker_state['kwargs'])
+    return record, profile
+
+
+# --------------------------------------------------
+def parallel_stream_main(main_arg, lines, resources, key_arg, weights_arg=False, notes_for_gen_chord_bool_arg=False,
+                         instrument_arg='', seed=None, jobs=2, tuning_arg=None, frets_arg=None):
+    """
+    stream_main split across a pool of jobs worker processes, yields the records in input order
+    Each line gets its own random.Random from the master seed so the output does not depend on jobs,
+    without a seed one is drawn so the workers do not share the random state they were forked with
+    The phases and counters of the workers are added to the active Profile, if there is one
+    """
+    check_main_args(main_arg=main_arg, key_arg=key_arg, instrument_arg=instrument_arg, resources=resources,
+                    tuning_arg=tuning_arg, frets_arg=frets_arg)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    kwargs = dict(main_arg=main_arg, key_arg=key_arg, weights_arg=weights_arg,
+                  notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg, instrument_arg=instrument_arg, seed=seed,
+                  tuning_arg=tuning_arg, frets_arg=frets_arg)
+    items = enumerate(lines, start=1)
+    profile = active_profile.get()
+    import multiprocessing
+    with multiprocessing.Pool(jobs, initializer=init_worker,
+                              initargs=(resources.dirname, kwargs, profile is not None)) as pool:
+        while True:
+            batch = list(itertools.islice(items, jobs * PARALLEL_BATCH_LINES))
+            if not batch:
+                break
+            results = pool.imap(run_worker_line, batch, chunksize=max(1, len(batch) // (jobs * 4)))
+            if profile is None:
+                yield from results
+                continue
+            for record, line_profile in results:
+                # the workers ran alongside this process, only their phases and counters add up
+                profile.merge(line_profile, wall=False)
+                yield record
+
+
+# --------------------------------------------------
+def read_input_lines(input_arg):
+    """Lazily yield the stripped lines of the input: stdin for '-', a file path, or else the input string"""
+    if input_arg == '-':
+        for line in sys.stdin:
+            yield line.strip()
+    elif os.path.exists(os.path.dirname(input_arg)):
+        # open and read the input file
+        with open(input_arg) as file:
+            for line in file:
+                yield line.strip()
+    else:
+        for line in input_arg.splitlines():
+            yield line.strip()
+
+
+# --------------------------------------------------
+def main():
+    """Make a jazz noise here"""
+    args = get_args()
+    if args.profile is None:
+        run_cli(args)
+        return
+    profile = Profile()
+    try:
+        with profiling(profile):
+            run_cli(args)
+    finally:
+        # written for a run that died as well, up to where it stopped
+        write_profile(profile=profile, profile_arg=args.profile)
+
+
+# --------------------------------------------------
+def write_profile(profile, profile_arg):
+    """Print the profile of a run to stderr, or write it as JSON to the file of --profile"""
+    report = profile.report()
+    if profile_arg == '-':
+        eprint(format_profile(report), end='')
+        return
+    import json
+    with open(profile_arg, 'w', encoding='utf-8') as file:
+        json.dump(report, file, indent=2)
+        file.write('\n')
+
+
+# --------------------------------------------------
+def run_cli(args):
+    """Run tune-tools.py with its command-line arguments"""
+    main_arg = args.main
+    key_arg = args.keys
+    input_arg = args.input
+    weights_arg = args.weights
+    notes_for_gen_chord_bool_arg = args.notes_gen_chord
+    instrument_arg = args.instrument
+
+    if args.build:
+        resources = write_resource_bundle()
+        load_suggest_scales_table(dirname=resources.dirname, chro_num_list=resources.chro_num_list,
+                                  chords_list=resources.chords_list, scales_list=resources.scales_list, rebuild=True)
+        return
+
+    if args.jobs < 1:
+        die(msg='Number of jobs should be at least 1')
+    if args.chart and main_arg not in CHORD_INPUT_FUNCTIONS + PROGRESSION_INPUT_FUNCTIONS:
+        die(msg=f"Chart input is read by: {', '.join(CHORD_INPUT_FUNCTIONS + PROGRESSION_INPUT_FUNCTIONS)}")
+    lines = read_input_lines(input_arg)
+    if args.chart and main_arg in PROGRESSION_INPUT_FUNCTIONS:
+        lines = [' | '.join(line for line in lines if line)]
+    elif args.chart:
+        lines = split_chart_lines(lines)
+
+    resources = Resources()
+    kwargs = dict(main_arg=main_arg, resources=resources, key_arg=key_arg, weights_arg=weights_arg,
+                  notes_for_gen_chord_bool_arg=notes_for_gen_chord_bool_arg, instrument_arg=instrument_arg,
+                  seed=args.seed, tuning_arg=args.tuning, frets_arg=args.frets)
+    if args.stream:
+        try:
+            if args.jobs > 1:
+                records = parallel_stream_main(lines=lines, jobs=args.jobs, **kwargs)
+            else:
+                records = stream_main(lines=lines, **kwargs)
+            if args.format == 'msgpack':
+                for record in records:
+                    sys.stdout.buffer.write(dump_results(obj=record, output_format='msgpack'))
+            else:
+                import json
+                for record in records:
+                    print(json.dumps(record, ensure_ascii=False))
+        except TuneToolsError as e:
+            die(msg=str(e))
+        return
+
+    input_list = list(lines)
+    try:
+        if args.format == 'text':
+            print(run_main(input_list=input_list, jobs=args.jobs, **kwargs), end='')
+        else:
+            result_list = run_main_results(input_list=input_list, jobs=args.jobs, **kwargs)
+            sys.stdout.buffer.write(dump_results(obj=result_list, output_format=args.format))
+    except TuneToolsError as e:
+        die(msg=str(e))
+
+
+# --------------------------------------------------
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: common_scale_segments, the two stack sliding window, finds the same maximal runs as a naive scan that
+grows a run from every item
+
+run:
+python3 -m pytest -q tests
+"""
+
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+
+
+# --------------------------------------------------
+def naive_segments(set_list):
+    """
+    The maximal runs of consecutive sets whose & is not empty by growing a run from every item, O(n * w) for runs
+    of w items: a run is maximal when the run from the item before it ends sooner, an empty set is a run of its own
+    """
+    segment_list = []
+    previous_last = -1
+    for first, first_set in enumerate(set_list):
+        if not first_set:
+            segment_list.append((first, first, 0))
+            previous_last = first
+            continue
+        last = first
+        common_set = first_set
+        while last + 1 < len(set_list) and common_set & set_list[last + 1]:
+            last += 1
+            common_set &= set_list[last]
+        if last > previous_last:
+            segment_list.append((first, last, common_set))
+        previous_last = last
+    return segment_list
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('set_list, expected', [
+    ([], []),
+    ([0b1], [(0, 0, 0b1)]),
+    ([0], [(0, 0, 0)]),
+    # every item shares a scale, so the window never has to shrink and the run is the whole input
+    ([0b111, 0b110, 0b011, 0b010, 0b111], [(0, 4, 0b010)]),
+    # no two neighbours share a scale
+    ([0b001, 0b010, 0b100, 0b001], [(0, 0, 0b001), (1, 1, 0b010), (2, 2, 0b100), (3, 3, 0b001)]),
+    # chords no scale contains
+    ([0, 0, 0b1, 0], [(0, 0, 0), (1, 1, 0), (2, 2, 0b1), (3, 3, 0)]),
+    # overlapping runs
+    ([0b011, 0b111, 0b110, 0b100], [(0, 2, 0b010), (1, 3, 0b100)]),
+])
+def test_edge_cases(set_list, expected):
+    """Empty input, a single item, one run over the whole input, no common scale and overlapping runs"""
+    assert tune_tools.common_scale_segments(set_list=set_list) == expected
+    assert naive_segments(set_list) == expected
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('bits', [2, 4, 8, 24])
+def test_matches_naive_scan(bits):
+    """Random lists of sets of a few scales up to many, some empty, give the runs of the naive scan"""
+    rng = random.Random(f'common_scale_segments:{bits}')
+    for _ in range(500):
+        set_list = [rng.getrandbits(bits) & rng.getrandbits(bits) if rng.random() < 0.9 else 0
+                    for _ in range(rng.randrange(0, 40))]
+        assert tune_tools.common_scale_segments(set_list=set_list) == naive_segments(set_list)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: suggest_scales matches the output of the original list based matching for every chord name of chords.tsv
+on each of the 12 roots and every root/bass slash chord, with both keys, by the search and by the answer table
+
+The golden files are the output of tune-tools.py at the baseline commit:
+python3 tune-tools.py -i ../tests/golden/suggest_scales_input.txt -m suggest_scales -k b
+python3 tune-tools.py -i ../tests/golden/suggest_scales_input.txt -m suggest_scales -k '#'
+
+run:
+python3 -m pytest -q tests
+"""
+
+import os
+import csv
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+GOLDEN = os.path.join(ROOT, 'tests', 'golden')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+
+ROOTS = ['C', 'Db', 'D', 'Eb', 'E', 'F', 'Gb', 'G', 'Ab', 'A', 'Bb', 'B']
+# The chord root modes added to the output after the golden files were made, a blank line when there are none
+MODE_SECTION_RE = re.compile(r'Mode\(s\) on the chord root\n(?:(?:.+\n)+|\n)\n')
+
+
+# --------------------------------------------------
+def read_golden(file_name):
+    """Text of a file under tests/golden"""
+    with open(os.path.join(GOLDEN, file_name), encoding='utf-8') as file:
+        return file.read()
+
+
+# --------------------------------------------------
+@pytest.fixture(scope='module')
+def resources():
+    """Resources loaded once for the module"""
+    return tune_tools.Resources()
+
+
+# --------------------------------------------------
+@pytest.fixture(scope='module')
+def input_list():
+    """The chord symbols the golden files were made from"""
+    return read_golden('suggest_scales_input.txt').splitlines()
+
+
+# --------------------------------------------------
+@pytest.fixture(scope='module')
+def suggest_scales_table(resources):
+    """The answer table built in memory, so the cache file in the resources directory is not touched"""
+    return tune_tools.build_suggest_scales_table(chro_num_list=resources.chro_num_list,
+                                                 chords_list=resources.chords_list,
+                                                 scales_list=resources.scales_list)
+
+
+# --------------------------------------------------
+def test_input_covers_every_chord(input_list):
+    """Every chord name on each root and every root/bass slash chord are in the input"""
+    with open(os.path.join(ROOT, 'src', 'resources', 'chords.tsv'), encoding='utf-8') as file:
+        name_list = [row['name'] for row in csv.DictReader(file, delimiter='\t')]
+    expected = [f'{root}{name}'.strip() for name in name_list for root in ROOTS]
+    expected += [f'{root}/{bass}' for root in ROOTS for bass in ROOTS]
+    assert input_list == expected
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('use_table', [False, True], ids=['search', 'table'])
+@pytest.mark.parametrize('key_arg, file_name', [('b', 'suggest_scales_flat.txt'),
+                                                ('#', 'suggest_scales_sharp.txt')], ids=['flat', 'sharp'])
+def test_suggest_scales_golden(resources, input_list, suggest_scales_table, use_table, key_arg, file_name):
+    """The suggested scales of every input chord, without the mode section, match the golden file"""
+    table = suggest_scales_table if use_table else None
+    result_list = [tune_tools.run_main_line(main_arg='suggest_scales', line=line, resources=resources,
+                                            key_arg=key_arg, suggest_scales_table=table) for line in input_list]
+    output = tune_tools.format_main_results(main_arg='suggest_scales', result_list=result_list)
+    assert MODE_SECTION_RE.sub('', output) == read_golden(file_name)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: optimize_voice_leading finds the least cost voicings of a chart, also when two chords of the chart share a
+label but not their candidates, e.g. 'D/C' and 'C/root+2'
+
+run:
+python3 -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+
+# Charts where a relative slash chord is labelled as another chord of the chart with different candidates
+SHARED_LABEL_CHARTS = ['Dm7 | C/root+2 | Dm7 | D/C', 'G7 | A/C | G7 | C/root+9']
+
+
+# --------------------------------------------------
+@pytest.fixture(scope='module')
+def resources():
+    """Resources loaded once for the module"""
+    return tune_tools.Resources()
+
+
+# --------------------------------------------------
+def least_cost(chart, resources, fingerboard):
+    """The least voice leading cost of a chart of voiced chords, by a plain dynamic program with no shared costs"""
+    total_by_voicing = None
+    for chord in tune_tools.parse_chord_chart(text=chart, chro_num_list=resources.chro_num_list):
+        _, candidate_list = tune_tools.get_chord_voicings(
+            input_chord=chord['input'], chro_num_list=resources.chro_num_list, chords_list=resources.chords_list,
+            key_arg='b', fingerboard_list=fingerboard, chord=chord, candidates=True)
+        if total_by_voicing is None:
+            total_by_voicing = {v: tune_tools.mute_cost(voicing=v) for v in candidate_list}
+            continue
+        total_by_voicing = {b: min(total + tune_tools.movement_cost(voicing_a=a, voicing_b=b)
+                                   for a, total in total_by_voicing.items()) + tune_tools.mute_cost(voicing=b)
+                            for b in candidate_list}
+    return min(total_by_voicing.values())
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('chart', SHARED_LABEL_CHARTS)
+def test_shared_label_least_cost(resources, chart):
+    """Chords sharing a label keep their own candidates and the chart is voiced at its least cost"""
+    fingerboard = resources.fingerboard_list('guitar')
+    res = tune_tools.run_main_line(main_arg='optimize_voice_leading', line=chart, resources=resources, key_arg='b',
+                                   instrument_arg='guitar')
+    assert all(s['frets'] is not None for s in res['step_list'])
+    assert res['voice_leading_cost'] == least_cost(chart=chart, resources=resources, fingerboard=fingerboard)
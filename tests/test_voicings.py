@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Author : Kai Blumberg
+Date   : 2023-03-16
+Purpose: find_voicings plays the root, 3rd and 7th of a chord, a slash chord with its bass lowest, and
+find_voicing_shapes finds the best ranked voicing of find_voicings for each lowest string and position
+
+run:
+python3 -m pytest -q tests
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+import tune_tools
+
+INSTRUMENTS = list(tune_tools.FRETBOARD_LAYOUTS)
+CHORDS = ['C', 'C/E', 'Cdim7', 'G7', 'D/Gb', 'F▵7', 'E7#9', 'Ab6']
+SLASH_CHORDS = ['C/E', 'G/B', 'D/Gb', 'Bb/D']
+
+
+# --------------------------------------------------
+@pytest.fixture(scope='module')
+def resources():
+    """Resources loaded once for the module"""
+    return tune_tools.Resources()
+
+
+# --------------------------------------------------
+def search_args(input_chord, resources, instrument):
+    """The pitch lists of the strings from the lowest up and the find_voicings arguments of a chord symbol"""
+    chro_num_list = resources.chro_num_list
+    chord = tune_tools.parse_printed_chord(input_chord=input_chord, chro_num_list=chro_num_list)
+    res = tune_tools.get_input_chord_result(input_chord=input_chord, chro_num_list=chro_num_list,
+                                            chords_list=resources.chords_list, key_arg='b', chord=chord)
+    root = chord['chrom_note']
+    bass = None
+    if chord['bass_note'] != '':
+        bass = tune_tools.get_chrom_number(chro_num_list=chro_num_list, note_str=chord['bass_note'])
+    required_mask = tune_tools.transpose_mask(resources.chords_list.required_mask_by_name[chord['chord_name']],
+                                              root - 1)
+    pitch_lists = resources.fingerboard_list(instrument).string_pitches[::-1]
+    return dict(pitch_lists=pitch_lists, mask=res.mask, required_mask=required_mask, root=root, bass=bass)
+
+
+# --------------------------------------------------
+def played_pitches(voicing, pitch_lists):
+    """The chromatic number of each string played from the lowest up"""
+    return [pitch_list[f] for f, pitch_list in zip(voicing, pitch_lists) if f is not None]
+
+
+# --------------------------------------------------
+def shape_group(voicing):
+    """The lowest string played and the position of a voicing, its lowest fretted note or 0 for open strings"""
+    lowest = next(i for i, f in enumerate(voicing) if f is not None)
+    return lowest, min((f for f in voicing if f), default=0)
+
+
+# --------------------------------------------------
+def rank(voicing, pitch_lists, root, bass):
+    """The rank of find_voicings: not the root (or bass) lowest, muted, open away from the open position, stretch"""
+    lowest, position = shape_group(voicing)
+    return (pitch_lists[lowest][voicing[lowest]] != (root if bass is None else bass), voicing.count(None),
+            voicing.count(0) if position > tune_tools.VOICING_SPAN else 0,
+            max((f for f in voicing if f), default=0) - position, position)
+
+
+# --------------------------------------------------
+def test_standard_shapes(resources):
+    """The open C/E shape is among the best listed on guitar"""
+    res = tune_tools.find_chord_voicings(input_list=['C/E'], chro_num_list=resources.chro_num_list,
+                                         chords_list=resources.chords_list, key_arg='b',
+                                         fingerboard_list=resources.fingerboard_list('guitar'), instrument='guitar')[0]
+    assert [0, 3, 2, 0, 1, 0] in [v['frets'] for v in res['voicing_list']]
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('instrument', INSTRUMENTS)
+def test_dim7_plays_its_seventh(resources, instrument):
+    """Every Cdim7 voicing plays the root C, the b3 Eb and the bb7 A"""
+    args = search_args(input_chord='Cdim7', resources=resources, instrument=instrument)
+    voicing_list = tune_tools.find_voicings(**args)
+    assert voicing_list
+    for voicing in voicing_list:
+        assert {1, 4, 10} <= set(played_pitches(voicing=voicing, pitch_lists=args['pitch_lists']))
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('instrument', INSTRUMENTS)
+@pytest.mark.parametrize('input_chord', SLASH_CHORDS)
+def test_slash_chord_bass_lowest(resources, instrument, input_chord):
+    """The lowest string played by every voicing of a slash chord plays its bass"""
+    args = search_args(input_chord=input_chord, resources=resources, instrument=instrument)
+    voicing_list = tune_tools.find_voicings(**args)
+    shape_list = tune_tools.find_voicing_shapes(**args)
+    assert voicing_list
+    for voicing in voicing_list + shape_list:
+        assert played_pitches(voicing=voicing, pitch_lists=args['pitch_lists'])[0] == args['bass']
+
+
+# --------------------------------------------------
+@pytest.mark.parametrize('instrument', INSTRUMENTS)
+@pytest.mark.parametrize('input_chord', CHORDS)
+def test_shapes_match_voicings(resources, instrument, input_chord):
+    """
+    find_voicing_shapes has a voicing of find_voicings for each lowest string and position, of the best rank of
+    that group, best ranked first (a group can have ties, so the voicings themselves may differ)
+    """
+    args = search_args(input_chord=input_chord, resources=resources, instrument=instrument)
+    voicing_list = tune_tools.find_voicings(**args)
+    shape_list = tune_tools.find_voicing_shapes(**args)
+    rank_args = dict(pitch_lists=args['pitch_lists'], root=args['root'], bass=args['bass'])
+    best_by_group = {}
+    for voicing in voicing_list:
+        best_by_group.setdefault(shape_group(voicing), rank(voicing=voicing, **rank_args))
+    assert set(shape_list) <= set(voicing_list)
+    assert {shape_group(v): rank(voicing=v, **rank_args) for v in shape_list} == best_by_group
+    assert len(shape_list) == len(best_by_group)
+    shape_ranks = [rank(voicing=v, **rank_args) for v in shape_list]
+    assert shape_ranks == sorted(shape_ranks)